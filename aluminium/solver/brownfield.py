@@ -10,6 +10,7 @@ from mppshared.agent_logic.agent_logic_functions import (
     remove_transition,
     select_best_transition,
 )
+from mppshared.models.asset import AssetStack
 from mppshared.models.constraints import check_constraints
 from mppshared.models.simulation_pathway import SimulationPathway
 from mppshared.utility.log_utility import get_logger
@@ -71,7 +72,7 @@ def brownfield(pathway: SimulationPathway, year: int) -> SimulationPathway:
             if pathway.pathway_name == "lc":
                 dict_stack_emissions = new_stack.calculate_emissions_stack(
                     year=year,
-                    df_emissions=pathway.emissions,
+                    emission_intensities=pathway.emission_intensities,
                     technology_classification=None,
                 )
                 # Compare scope 1 and 2 CO2 emissions to the allowed limit in that year
@@ -120,12 +121,18 @@ def brownfield(pathway: SimulationPathway, year: int) -> SimulationPathway:
         # If several candidates for best transition, choose asset for transition randomly
         asset_to_update = random.choice(best_candidates)
 
-        # Update asset tentatively (needs deepcopy to provide changes to original stack)
-        tentative_stack = deepcopy(new_stack)
+        # Update asset tentatively. The tentative stack gets its own list of the current stack's Assets, and the
+        #   updated Asset is a copy, so the current stack is not changed
+        tentative_stack = AssetStack(
+            assets=list(new_stack.assets),
+            emission_scopes=new_stack.emission_scopes,
+            ghgs=new_stack.ghgs,
+            cuf_lower_threshold=new_stack.cuf_lower_threshold,
+        )
         origin_technology = asset_to_update.technology
         tentative_stack.update_asset(
             year=year,
-            asset_to_update=asset_to_update,
+            asset_to_update=deepcopy(asset_to_update),
             new_technology=new_technology,
             new_classification=best_transition["technology_classification"],
             asset_lifetime=best_transition["technology_lifetime"],
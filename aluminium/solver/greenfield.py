@@ -1,9 +1,4 @@
 """ Logic for technology transitions of type greenfield (add new Asset to AssetStack."""
-import sys
-from copy import deepcopy
-from importlib.resources import path
-from multiprocessing.sharedctypes import Value
-from operator import methodcaller
 
 import numpy as np
 import pandas as pd
@@ -69,7 +64,7 @@ def greenfield(pathway: SimulationPathway, year: int) -> SimulationPathway:
 
         # For each region with a production deficit, build new capacity until production meets required minimum
         for (index, row) in df_regional_production.loc[
-            df_regional_production["check"] == False
+            ~df_regional_production["check"]
         ].iterrows():
             deficit = (
                 row["annual_production_volume_minimum"]
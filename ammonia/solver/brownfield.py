@@ -26,10 +26,10 @@ from mppshared.agent_logic.brownfield import (
     apply_brownfield_filters_ammonia,
     apply_start_years_brownfield_transitions,
 )
+from mppshared.models.asset import AssetStack
 from mppshared.models.constraints import check_constraints
 from mppshared.models.simulation_pathway import SimulationPathway
 from mppshared.utility.log_utility import get_logger
-from pandera import Bool
 
 logger = get_logger(__name__)
 logger.setLevel(LOG_LEVEL)
@@ -126,8 +126,14 @@ def brownfield(pathway: SimulationPathway, year: int) -> SimulationPathway:
         # If several candidates for best transition, choose asset for transition randomly
         asset_to_update = random.choice(best_candidates)
 
-        # Update asset tentatively (needs deepcopy to provide changes to original stack)
-        tentative_stack = deepcopy(new_stack)
+        # Update asset tentatively. The tentative stack gets its own list of the current stack's Assets, and the
+        #   updated Asset is a copy, so the current stack is not changed
+        tentative_stack = AssetStack(
+            assets=list(new_stack.assets),
+            emission_scopes=new_stack.emission_scopes,
+            ghgs=new_stack.ghgs,
+            cuf_lower_threshold=new_stack.cuf_lower_threshold,
+        )
         origin_technology = asset_to_update.technology
         tentative_stack.update_asset(
             year=year,
@@ -150,7 +156,7 @@ def brownfield(pathway: SimulationPathway, year: int) -> SimulationPathway:
         )
 
         # If no constraint is hurt, execute the brownfield transition
-        if all(constraint == True for constraint in dict_constraints.values()):
+        if all(dict_constraints.values()):
             logger.debug(
                 f"Updating {asset_to_update.product} asset from technology {origin_technology} to technology {new_technology} in region {asset_to_update.region}, annual production {asset_to_update.get_annual_production_volume()} and UUID {asset_to_update.uuid}"
             )
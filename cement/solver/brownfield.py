@@ -19,6 +19,7 @@ from mppshared.agent_logic.agent_logic_functions import (
     remove_transition,
     select_best_transition,
 )
+from mppshared.models.asset import AssetStack
 from mppshared.models.constraints import (
     check_co2_storage_constraint,
     check_constraints,
@@ -114,7 +115,7 @@ def _enact_brownfield_transition(
             if pathway.pathway_name == "lc" and pathway.carbon_budget is not None:
                 dict_stack_emissions = stack.calculate_emissions_stack(
                     year=year,
-                    df_emissions=pathway.emissions,
+                    emission_intensities=pathway.emission_intensities,
                     technology_classification=None,
                 )
                 # Compare scope 1 and 2 CO2 emissions to the allowed limit in that year
@@ -159,8 +160,14 @@ def _enact_brownfield_transition(
         # If several candidates for best transition, choose asset for transition randomly
         asset_to_update = random.choice(candidates_best_transition)
 
-        # Update asset tentatively (needs deepcopy to provide changes to original stack)
-        tentative_stack = deepcopy(stack)
+        # Update asset tentatively. The tentative stack gets its own list of the current stack's Assets, and the
+        #   updated Asset is a copy, so the current stack is not changed
+        tentative_stack = AssetStack(
+            assets=list(stack.assets),
+            emission_scopes=stack.emission_scopes,
+            ghgs=stack.ghgs,
+            cuf_lower_threshold=stack.cuf_lower_threshold,
+        )
         assert (origin_technology == asset_to_update.technology) & (
             asset_to_update.region == best_transition["region"]
         )
@@ -237,13 +244,13 @@ def _enact_brownfield_transition(
                     # check if the switch reduces the total emissions
                     dict_stack_emissions = stack.calculate_emissions_stack(
                         year=year,
-                        df_emissions=pathway.emissions,
+                        emission_intensities=pathway.emission_intensities,
                         technology_classification=None,
                     )
                     dict_tentative_stack_emissions = (
                         tentative_stack.calculate_emissions_stack(
                             year=year,
-                            df_emissions=pathway.emissions,
+                            emission_intensities=pathway.emission_intensities,
                             technology_classification=None,
                         )
                     )
@@ -130,14 +130,21 @@ def _simulate(pathway: SimulationPathway) -> SimulationPathway:
 
 
 def _check_all_constraints(pathway: SimulationPathway, year: int, transition_type: str):
-    # Check constraints with tentative new stack
+    # Check constraints with tentative new stack. Only overall fulfilment is logged, so the check can stop at the first
+    #   constraint that is hurt
     dict_constraints = check_constraints(
         pathway=pathway,
         stack=pathway.stacks[year],
         year=year,
         transition_type=transition_type,
         product=PRODUCTS[0],
+        constraints_to_apply=[
+            constraint
+            for constraint in pathway.constraints_to_apply
+            if constraint != "regional_constraint"
+        ],
         region=None,
+        short_circuit=True,
     )
     # If no constraint is hurt, execute the brownfield transition
     if all(
@@ -278,6 +278,7 @@ def increase_cuf_of_assets(
         # logger.debug(f"Increase CUF of {str(asset)}")
         asset.cuf = cuf_upper_threshold
         assets_below_cuf_threshold.pop(0)
+        stack.invalidate_cache()
 
     return pathway
 
@@ -316,6 +317,7 @@ def decrease_cuf_of_assets(
         # logger.debug(f"Decrease CUF of {str(asset)}")
         _asset.cuf = cuf_lower_threshold
         assets_above_cuf_threshold.pop(0)
+        stack.invalidate_cache()
 
     return pathway
 
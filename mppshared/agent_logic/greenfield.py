@@ -1,7 +1,6 @@
 """ Logic for technology transitions of type greenfield (add new Asset to AssetStack."""
 
 import sys
-from copy import deepcopy
 
 import numpy as np
 import pandas as pd
@@ -117,8 +116,13 @@ def select_asset_for_greenfield(
         logger.debug(
             f"{year}: Attempting to build asset in {new_asset.region} (technology: {new_asset.technology})"
         )
-        tentative_stack = deepcopy(stack)
-        tentative_stack.append(new_asset)
+        # The constraint checks only read the tentative stack, so it can share the Assets of the current stack
+        tentative_stack = AssetStack(
+            assets=stack.assets + [new_asset],
+            emission_scopes=stack.emission_scopes,
+            ghgs=stack.ghgs,
+            cuf_lower_threshold=stack.cuf_lower_threshold,
+        )
 
         constraints_to_apply = get_constraints_to_apply(
             pathway_constraints_to_apply=pathway.constraints_to_apply,
@@ -1,9 +1,11 @@
 """Asset and asset stack classes, code adapted from MCC"""
 import sys
+from collections import Counter
+from collections.abc import Iterable
 from copy import deepcopy
 from uuid import uuid4
-from xmlrpc.client import Boolean
 
+import numpy as np
 import pandas as pd
 from mppshared.config import LOG_LEVEL
 from mppshared.utility.dataframe_utility import get_emission_columns
@@ -12,10 +14,39 @@ from mppshared.utility.utils import get_logger, get_unique_list_values
 logger = get_logger(__name__)
 logger.setLevel(LOG_LEVEL)
 
+# Asset regions that are reported as part of a larger region in the regional production volume
+MAP_PRODUCTION_REGIONS = {
+    "Brazil": "Latin America",
+    "Namibia": "Africa",
+    "Saudi Arabia": "Middle East",
+    "Australia": "Oceania",
+}
+
 
 class Asset:
     """Define an asset that produces a specific product with a specific technology."""
 
+    # Fixed set of attributes, which makes assets smaller and attribute access faster in the loops over large stacks
+    __slots__ = (
+        "uuid",
+        "product",
+        "technology",
+        "region",
+        "year_commissioned",
+        "annual_production_capacity",
+        "cuf",
+        "cuf_lower_threshold",
+        "emission_scopes",
+        "ghgs",
+        "retrofit",
+        "rebuild",
+        "greenfield",
+        "asset_lifetime",
+        "technology_classification",
+        "ppa_allowed",
+        "stay_same",
+    )
+
     def __init__(
         self,
         product: str,
@@ -62,6 +93,17 @@ class Asset:
         self.ppa_allowed = ppa_allowed
         self.stay_same = stay_same
 
+    def __deepcopy__(self, memo):
+        # Copy the slots directly, which is faster than the generic copy protocol for objects without __dict__. All
+        #   attributes are immutable apart from the lists of emission scopes and GHGs
+        new_asset = Asset.__new__(Asset)
+        memo[id(self)] = new_asset
+        for attribute in Asset.__slots__:
+            setattr(new_asset, attribute, getattr(self, attribute))
+        new_asset.emission_scopes = deepcopy(self.emission_scopes, memo)
+        new_asset.ghgs = deepcopy(self.ghgs, memo)
+        return new_asset
+
     def __str__(self):
         return f"<Asset with UUID {self.uuid}, technology {self.technology} in region {self.region}>"
 
@@ -127,6 +169,12 @@ class AssetStack:
         self.cuf_lower_threshold = cuf_lower_threshold
         # Keep track of all assets added this year
         self.new_ids: list[str] = []
+        # Incremented on every change to the assets, which also discards the cached aggregates
+        self.version = 0
+        self._regional_production_cache: dict = {}
+        self._aggregate_cache: dict = {}
+        self._df_assets: pd.DataFrame | None = None
+        self._number_of_assets_by_technology: pd.Series | None = None
 
     def __eq__(self, other):
         self_uuids = {asset.uuid for asset in self.assets}
@@ -136,11 +184,22 @@ class AssetStack:
     def remove(self, remove_asset: Asset):
         """Remove asset from stack"""
         self.assets = [asset for asset in self.assets if asset != remove_asset]
+        self.invalidate_cache()
 
     def append(self, new_asset: Asset):
         """Add new asset to stack"""
         self.assets.append(new_asset)
         self.new_ids.append(new_asset.uuid)
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """Discard cached aggregates of the stack. Needs to be called after changing attributes of the stack's Assets
+        directly, e.g. their CUF"""
+        self.version += 1
+        self._regional_production_cache = {}
+        self._aggregate_cache = {}
+        self._df_assets = None
+        self._number_of_assets_by_technology = None
 
     def update_asset(
         self,
@@ -197,13 +256,14 @@ class AssetStack:
 
         self.assets = [asset for asset in self.assets if asset.uuid != uuid_update]
         self.assets.append(asset_to_update)
+        self.invalidate_cache()
 
         # check to make sure that number of assets does not change
         assert len_pre == len(
             self.assets
         ), "Function update_asset has changed the number of assets in the stack!"
 
-    def empty(self) -> Boolean:
+    def empty(self) -> bool:
         """Return True if no asset in stack"""
         return not self.assets
 
@@ -306,39 +366,72 @@ class AssetStack:
         Returns:
             Dataframe with technologies
         """
+        # The aggregate is cached until the stack changes, since the constraints aggregate the same stacks repeatedly
+        key = (tuple(aggregation_vars), technology_classification, product)
+        if key not in self._aggregate_cache:
+            self._aggregate_cache[key] = self._aggregate_stack(
+                aggregation_vars=aggregation_vars,
+                technology_classification=technology_classification,
+                product=product,
+            )
+        return self._aggregate_cache[key].copy()
 
+    def _aggregate_stack(
+        self,
+        aggregation_vars: list,
+        technology_classification: str | None = None,
+        product: str | None = None,
+    ) -> pd.DataFrame:
         # Optional filter by technology classification and product
-        assets = self.filter_assets(
-            technology_classification=technology_classification, product=product
-        )
+        df = self.get_assets_table()
+        if technology_classification is not None:
+            df = df.loc[df["technology_classification"] == technology_classification]
+        if product is not None:
+            df = df.loc[df["product"] == product]
+        if df.empty:
+            # There are no assets
+            return pd.DataFrame()
 
         # Aggregate stack to DataFrame
-        df = pd.DataFrame(
-            [
+        return df.groupby(aggregation_vars).agg(
+            annual_production_capacity=("annual_production_capacity", "sum"),
+            annual_production_volume=("annual_production_volume", "sum"),
+            number_of_assets=("annual_production_capacity", "count"),
+        )
+
+    def get_assets_table(self) -> pd.DataFrame:
+        """Get product, technology, region, technology classification, annual production capacity and annual
+        production volume of all assets as DataFrame with one row per asset. The table is built column by column and
+        kept until the stack changes, so it must not be modified"""
+        if self._df_assets is None:
+            annual_production_capacity = np.fromiter(
+                (asset.annual_production_capacity for asset in self.assets),
+                dtype=np.float64,
+                count=len(self.assets),
+            )
+            cuf = np.fromiter(
+                (asset.cuf for asset in self.assets),
+                dtype=np.float64,
+                count=len(self.assets),
+            )
+            self._df_assets = pd.DataFrame(
                 {
-                    "product": asset.product,
-                    "technology": asset.technology,
-                    "region": asset.region,
-                    "annual_production_capacity": asset.get_annual_production_capacity(),
-                    "annual_production_volume": asset.get_annual_production_volume(),
+                    "product": [asset.product for asset in self.assets],
+                    "technology": [asset.technology for asset in self.assets],
+                    "region": [asset.region for asset in self.assets],
+                    "technology_classification": [
+                        asset.technology_classification for asset in self.assets
+                    ],
+                    "annual_production_capacity": annual_production_capacity,
+                    "annual_production_volume": annual_production_capacity * cuf,
                 }
-                for asset in assets
-            ]
-        )
-        try:
-            return df.groupby(aggregation_vars).agg(
-                annual_production_capacity=("annual_production_capacity", "sum"),
-                annual_production_volume=("annual_production_volume", "sum"),
-                number_of_assets=("annual_production_capacity", "count"),
             )
-        except KeyError:
-            # There are no assets
-            return pd.DataFrame()
+        return self._df_assets
 
     def calculate_emissions_stack(
         self,
         year: int,
-        df_emissions: pd.DataFrame,
+        emission_intensities: dict,
         technology_classification=None,
         product=None,
     ) -> dict:
@@ -349,45 +442,87 @@ class AssetStack:
         emission_columns = get_emission_columns(
             ghgs=self.ghgs, scopes=self.emission_scopes
         )
-        dict_emissions = dict.fromkeys(emission_columns)
-
-        # Get DataFrame with annual production volume by product, region and technology (optionally filtered for
-        #   technology classification and specific product)
-        df_stack = self.aggregate_stack(
-            aggregation_vars=["technology", "product", "region"],
+        emissions = self._sum_emissions(
+            year=year,
+            emission_intensities=emission_intensities,
+            emission_columns=emission_columns,
             technology_classification=technology_classification,
             product=product,
         )
 
-        # If the stack DataFrame is empty, return 0 for all emissions
-        if df_stack.empty:
-            for scope in dict_emissions.keys():
-                dict_emissions[scope] = 0
-            return dict_emissions
+        # If the stack is empty, return 0 for all emissions
+        if emissions is None:
+            return dict.fromkeys(emission_columns, 0)
 
-        df_stack = df_stack.reset_index()
+        return dict(zip(emission_columns, emissions))
 
-        # Filter emissions DataFrame for the given year
-        df_emissions = df_emissions.reset_index()
-        df_emissions = df_emissions[(df_emissions.year == year)]
+    def calculate_co2_scope1_2_stack(
+        self,
+        year: int,
+        emission_intensities: dict,
+        technology_classification=None,
+        product=None,
+    ) -> float:
+        """Calculate scope 1 and 2 CO2 emissions of the current stack in MtCO2, optionally filtered for technology
+        classification and/or a specific product"""
+        emissions = self._sum_emissions(
+            year=year,
+            emission_intensities=emission_intensities,
+            emission_columns=["co2_scope1", "co2_scope2"],
+            technology_classification=technology_classification,
+            product=product,
+        )
+        if emissions is None:
+            return 0
+        return emissions[0] + emissions[1]
+
+    def _sum_emissions(
+        self,
+        year: int,
+        emission_intensities: dict,
+        emission_columns: list,
+        technology_classification=None,
+        product=None,
+    ) -> np.ndarray | None:
+        """Sum emissions of the current stack for each of the emission columns, None if the (filtered) stack is
+        empty"""
 
-        # Add emissions by GHG and scope to each technologyy
-        df_emissions_stack = df_stack.merge(
-            df_emissions, how="left", on=["technology", "product", "region"]
+        # Sum annual production volume by technology, product and region (optionally filtered for technology
+        #   classification and specific product). A plain dict is much cheaper than building and grouping a DataFrame
+        assets = self.filter_assets(
+            technology_classification=technology_classification, product=product
+        )
+        if not assets:
+            return None
+        volumes: dict[tuple, float] = {}
+        for asset in assets:
+            key = (asset.technology, asset.product, asset.region)
+            volumes[key] = volumes.get(key, 0) + asset.get_annual_production_volume()
+        production_volume = np.fromiter(
+            volumes.values(), dtype=np.float64, count=len(volumes)
         )
 
-        for emission_item in emission_columns:
-            dict_emissions[emission_item] = (
-                df_emissions_stack[emission_item]
-                * df_emissions_stack["annual_production_volume"]
-            ).sum()
+        # Emission intensities by GHG and scope in the given year, aligned with the production volumes. Combinations
+        #   without emissions data get zero intensity
+        lookup = emission_intensities.get(year)
+        if lookup is None:
+            intensities = np.zeros((len(volumes), len(emission_columns)))
+        else:
+            intensities = np.array(
+                [
+                    [lookup[column].get(key, 0) for column in emission_columns]
+                    for key in volumes
+                ],
+                dtype=np.float64,
+            ).reshape(len(volumes), len(emission_columns))
 
-        return dict_emissions
+        # Sum emissions over the stack as a single matrix-vector product
+        return production_volume @ intensities
 
     def calculate_co2_captured_stack(
         self,
         year: int,
-        df_emissions: pd.DataFrame,
+        emission_intensities: dict,
         technology_classification: str | None = None,
         product: str | None = None,
         region: str | None = None,
@@ -397,7 +532,8 @@ class AssetStack:
 
         Args:
             year ():
-            df_emissions ():
+            emission_intensities (): emission intensities of the pathway by year, emission column and (technology,
+                product, region)
             technology_classification ():
             product ():
             region ():
@@ -407,6 +543,65 @@ class AssetStack:
         Returns:
 
         """
+        return self.calculate_cumulative_co2_captured_stack(
+            years=[year],
+            emission_intensities=emission_intensities,
+            technology_classification=technology_classification,
+            product=product,
+            region=region,
+            usage_storage=usage_storage,
+        )
+
+    def calculate_cumulative_co2_captured_stack(
+        self,
+        years: Iterable[int],
+        emission_intensities: dict,
+        technology_classification: str | None = None,
+        product: str | None = None,
+        region: str | None = None,
+        usage_storage: str | None = None,
+    ) -> float:
+        """Calculate the CO2 captured by the stack summed over several years, with the emission factors of each year.
+        The stack is only aggregated once for all years. Arguments as in calculate_co2_captured_stack."""
+        co2_captured = self._calculate_cumulative_co2_captured(
+            years=years,
+            emission_intensities=emission_intensities,
+            technology_classification=technology_classification,
+            product=product,
+            region=region,
+            usage_storage=usage_storage,
+        )
+        return float(co2_captured.sum())
+
+    def calculate_cumulative_co2_captured_stack_by_region(
+        self,
+        years: Iterable[int],
+        emission_intensities: dict,
+        technology_classification: str | None = None,
+        product: str | None = None,
+        usage_storage: str | None = None,
+    ) -> pd.Series:
+        """Calculate the CO2 captured by the stack in each region summed over several years, with the emission factors
+        of each year. Regions without assets are not included. Arguments as in calculate_co2_captured_stack."""
+        co2_captured = self._calculate_cumulative_co2_captured(
+            years=years,
+            emission_intensities=emission_intensities,
+            technology_classification=technology_classification,
+            product=product,
+            usage_storage=usage_storage,
+        )
+        return co2_captured.groupby(level="region").sum()
+
+    def _calculate_cumulative_co2_captured(
+        self,
+        years: Iterable[int],
+        emission_intensities: dict,
+        technology_classification: str | None = None,
+        product: str | None = None,
+        region: str | None = None,
+        usage_storage: str | None = None,
+    ) -> pd.Series:
+        """CO2 captured summed over several years by technology, product and region of the stack"""
 
         # Get DataFrame with annual production volume by product, region and technology (optionally filtered for
         #   technology classification and specific product)
@@ -416,35 +611,39 @@ class AssetStack:
             product=product,
         )
 
-        # If the stack DataFrame is empty, return 0 for all emissions
+        # If the stack DataFrame is empty, no CO2 is captured
         if df_stack.empty:
-            return float(0)
-
-        df_stack = df_stack.reset_index()
-
-        # Filter emissions DataFrame for the given year
-        df_emissions = df_emissions.reset_index()
-        df_emissions = df_emissions.loc[(df_emissions.year == year), :]
-
-        # Add emissions by GHG and scope to each technology
-        df_stack = df_stack.merge(
-            df_emissions, how="left", on=["technology", "product", "region"]
-        )
+            return pd.Series(
+                dtype=np.float64,
+                index=pd.MultiIndex.from_arrays(
+                    [[], [], []], names=["technology", "product", "region"]
+                ),
+            )
 
         # apply filters
         if region:
-            df_stack = df_stack.loc[(df_stack.region == region), :]
-
+            df_stack = df_stack.loc[
+                df_stack.index.get_level_values("region") == region, :
+            ]
         if usage_storage:
             df_stack = df_stack.loc[
-                (df_stack["technology"].str.contains(usage_storage)), :
+                df_stack.index.get_level_values("technology").str.contains(
+                    usage_storage
+                ),
+                :,
             ]
 
-        co2_captured = (
-            df_stack["co2_scope1_captured"] * df_stack["annual_production_volume"]
-        ).sum()
-
-        return co2_captured
+        # Sum the emission factors over all years from the per-year lookups, since the production volume is the same
+        #   in every year. Missing emission factors count as zero
+        intensities = np.zeros(len(df_stack), dtype=np.float64)
+        for year in years:
+            if year not in emission_intensities:
+                continue
+            lookup = emission_intensities[year]["co2_scope1_captured"]
+            intensities += np.array(
+                [lookup.get(key, 0) for key in df_stack.index], dtype=np.float64
+            )
+        return df_stack["annual_production_volume"].astype(np.float64) * intensities
 
     def export_stack_to_df(self) -> pd.DataFrame:
         """Format the entire AssetStack as a DataFrame (no aggregation)."""
@@ -502,6 +701,13 @@ class AssetStack:
 
     def get_regional_production_volume(self, product):
         """Get annual production volume in each region for a specific product."""
+        if product not in self._regional_production_cache:
+            self._regional_production_cache[
+                product
+            ] = self._aggregate_regional_production_volume(product)
+        return self._regional_production_cache[product].copy()
+
+    def _aggregate_regional_production_volume(self, product):
         assets = self.filter_assets(product)
         df = pd.DataFrame(
             {
@@ -510,17 +716,19 @@ class AssetStack:
             }
             for asset in assets
         )
-        df["region"] = df["region"].replace(
-            {
-                "Brazil": "Latin America",
-                "Namibia": "Africa",
-                "Saudi Arabia": "Middle East",
-                "Australia": "Oceania",
-            }
-        )
+        df["region"] = df["region"].replace(MAP_PRODUCTION_REGIONS)
         df = df.groupby("region", as_index=False).sum()
         return df
 
+    def get_number_of_assets_by_technology(self) -> pd.Series:
+        """Get the number of assets for each technology in the stack (sorted technology index)"""
+        if self._number_of_assets_by_technology is None:
+            number_of_assets = Counter(asset.technology for asset in self.assets)
+            self._number_of_assets_by_technology = pd.Series(
+                number_of_assets, dtype=np.int64, name="number_of_assets"
+            ).sort_index()
+        return self._number_of_assets_by_technology.copy()
+
     def get_number_of_assets(
         self, product=None, technology=None, region=None, status=None
     ):
@@ -650,6 +858,29 @@ class AssetStack:
         return deepcopy(list(candidates_rebuild))
 
 
+def make_emission_intensities(
+    df_emissions: pd.DataFrame,
+) -> dict[int, dict[str, dict[tuple, float]]]:
+    """Make lookup of emission intensities by year, emission column and (technology, product, region). Missing
+    emission intensities are zero"""
+    df_emissions = df_emissions.select_dtypes("number").fillna(0)
+    emission_intensities = {}
+    for year, df_year in df_emissions.groupby(level="year"):
+        index = list(
+            zip(
+                *(
+                    df_year.index.get_level_values(level)
+                    for level in ["technology", "product", "region"]
+                )
+            )
+        )
+        emission_intensities[year] = {
+            column: dict(zip(index, df_year[column].to_numpy(dtype=np.float64)))
+            for column in df_year.columns
+        }
+    return emission_intensities
+
+
 def make_new_asset(
     asset_transition: dict,
     df_technology_characteristics: pd.DataFrame,
@@ -1,19 +1,66 @@
-import sys
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
-import plotly.express as px
 from mppshared.config import LOG_LEVEL
 from mppshared.import_data.intermediate_data import IntermediateDataImporter
 from mppshared.utility.utils import get_logger
-from plotly.offline import plot
-from plotly.subplots import make_subplots
 
 logger = get_logger(__name__)
 logger.setLevel(LOG_LEVEL)
 
 
+@lru_cache(maxsize=None)
+def year_index(start_year: int, end_year: int) -> pd.RangeIndex:
+    """Index with all years from start_year to end_year. RangeIndex is immutable, so the cached object can be shared
+    by all emissions pathways."""
+    return pd.RangeIndex(start_year, end_year + 1, step=1, name="year")
+
+
+def linear_emissions_pathway(
+    start_year: int,
+    end_year: int,
+    action_start: int,
+    emissions_start: float,
+    emissions_end: float,
+) -> np.ndarray:
+    """Annual emissions that stay at emissions_start until action_start and then decrease linearly to emissions_end
+    in end_year. Returns one value per year from start_year to end_year."""
+    values = np.full(end_year - start_year + 1, emissions_start, dtype=float)
+    values[action_start - start_year :] = np.linspace(
+        emissions_start, emissions_end, num=end_year - action_start + 1
+    )
+    return values
+
+
+class CarbonBudgetInfeasibleError(ValueError):
+    """Raised if the emissions pathway of a sector exceeds its sectoral carbon budget"""
+
+    def __init__(self, sector: str, cumulative_emissions: float, budget: float):
+        self.sector = sector
+        self.cumulative_emissions = cumulative_emissions
+        self.budget = budget
+        super().__init__(
+            f"Config parameters for linear shape do not yield carbon budget shape within the sectoral budget of "
+            f"{sector} (cumulative emissions: {cumulative_emissions} GtCO2, budget: {budget} GtCO2)!"
+        )
+
+
 class CarbonBudget:
+    __slots__ = (
+        "start_year",
+        "end_year",
+        "sector",
+        "budgets",
+        "pathway_shape",
+        "importer",
+        "carbon_budget_sector_csv",
+        "sectoral_carbon_pathway",
+        "df_pathway",
+        "first_year",
+        "annual_limits",
+    )
+
     def __init__(
         self,
         start_year: int,
@@ -35,6 +82,33 @@ class CarbonBudget:
         self.carbon_budget_sector_csv = carbon_budget_sector_csv
         self.sectoral_carbon_pathway = sectoral_carbon_pathway
         self.df_pathway = self.create_emissions_pathway(pathway_shape=pathway_shape)
+
+        # Annual emissions limits as array indexed by year - first_year for fast lookup in the constraint checks. Every
+        #   year needs exactly one limit
+        annual_limit = self.df_pathway["annual_limit"]
+        if not annual_limit.index.is_unique:
+            duplicated_years = sorted(
+                set(annual_limit.index[annual_limit.index.duplicated()])
+            )
+            raise ValueError(
+                f"Carbon budget of {sector} has several annual emissions limits for the years "
+                f"{[int(year) for year in duplicated_years]}"
+            )
+        nan_years = annual_limit.index[annual_limit.isna()]
+        if len(nan_years) > 0:
+            raise ValueError(
+                f"Carbon budget of {sector} has NaN as annual emissions limit for the years "
+                f"{[int(year) for year in nan_years]}"
+            )
+        self.first_year = int(annual_limit.index.min())
+        self.annual_limits = annual_limit.reindex(
+            pd.RangeIndex(self.first_year, annual_limit.index.max() + 1)
+        ).to_numpy(dtype=np.float64)
+        missing_years = self.first_year + np.flatnonzero(np.isnan(self.annual_limits))
+        if missing_years.size > 0:
+            raise ValueError(
+                f"Carbon budget of {sector} is missing the years {[int(year) for year in missing_years]}"
+            )
         logger.info("Carbon Budget initialized")
 
     def __repr__(self):
@@ -52,29 +126,30 @@ class CarbonBudget:
             df = self.importer.get_carbon_budget()
             df.set_index("year", inplace=True)
         else:
-            index = pd.RangeIndex(
-                self.start_year, self.end_year + 1, step=1, name="year"
-            )
+            index = year_index(self.start_year, self.end_year)
 
-            # Annual emissions are reduced linearly
             trajectory = self.sectoral_carbon_pathway
-            if pathway_shape == "linear":
-                initial_level = np.full(
-                    trajectory["action_start"] - self.start_year,
-                    trajectory["emissions_start"],
-                )
-                linear_reduction = np.linspace(
-                    trajectory["emissions_start"],
-                    trajectory["emissions_end"],
-                    num=self.end_year - trajectory["action_start"] + 1,
+
+            def _linear_values() -> np.ndarray:
+                # Annual emissions are reduced linearly
+                values = linear_emissions_pathway(
+                    start_year=self.start_year,
+                    end_year=self.end_year,
+                    action_start=trajectory["action_start"],
+                    emissions_start=trajectory["emissions_start"],
+                    emissions_end=trajectory["emissions_end"],
                 )
-                values = np.concatenate((initial_level, linear_reduction))
 
                 if values.sum() > self.budgets[self.sector]:
-                    sys.exit(
-                        "Config parameters for linear shape do not yield carbon budget shape within the sectoral "
-                        "budget!"
+                    raise CarbonBudgetInfeasibleError(
+                        sector=self.sector,
+                        cumulative_emissions=float(values.sum()),
+                        budget=float(self.budgets[self.sector]),
                     )
+                return values
+
+            if pathway_shape == "linear":
+                values = _linear_values()
 
             if pathway_shape == "cement":
                 # init values with immediate action start
@@ -90,25 +165,30 @@ class CarbonBudget:
                 )[1:]
                 values = np.concatenate((values1, values2))
 
-                # check whether the initial values are within the total carbon budget and revert to linear shape if so
+                # check whether the initial values are within the total carbon budget and revert to linear shape if not
                 if values.sum() > self.budgets[self.sector]:
                     logger.critical(
                         "Cannot find exponential carbon budget shape within the sectoral budget! "
                         "Revert to linear shape."
                     )
-                    self.pathway_shape = "linear"
-                    self.create_emissions_pathway(pathway_shape=self.pathway_shape)
+                    values = _linear_values()
 
-            df = pd.DataFrame(data={"year": index, "annual_limit": values}).set_index(
-                "year"
-            )
+            df = pd.DataFrame(data={"annual_limit": values}, index=index)
         return df
 
     def get_annual_emissions_limit(self, year: int) -> float:
         """Get scope 1 and 2 CO2 emissions limit for a specific year for the given sector"""
-        return self.df_pathway.loc[year, "annual_limit"]
+        idx = year - self.first_year
+        if not 0 <= idx < self.annual_limits.size:
+            raise KeyError(year)
+        return float(self.annual_limits[idx])
 
     def output_carbon_budget(self, sector: str, importer: IntermediateDataImporter):
+        # Plotly is only needed for the output, so import it here to keep the pathway calculations lightweight
+        import plotly.express as px
+        from plotly.offline import plot
+        from plotly.subplots import make_subplots
+
         if self.carbon_budget_sector_csv:
             df = self.importer.get_carbon_budget()
             df.set_index("year", inplace=True)
@@ -2,6 +2,45 @@ import numpy as np
 import pandas as pd
 
 
+def _build_constant(
+    years: np.ndarray,
+    initial_carbon_cost: float,
+    final_carbon_cost: float,
+    start_year: int,
+    end_year: int,
+) -> np.ndarray:
+    """Carbon cost is zero before the start year and constant from then on"""
+    carbon_cost = np.zeros(years.size, dtype=np.float64)
+    carbon_cost[np.searchsorted(years, start_year) :] = initial_carbon_cost
+    return carbon_cost
+
+
+def _build_linear(
+    years: np.ndarray,
+    initial_carbon_cost: float,
+    final_carbon_cost: float,
+    start_year: int,
+    end_year: int,
+) -> np.ndarray:
+    """Carbon cost is zero before the start year, increases linearly until the end year and is constant after"""
+    carbon_cost = np.zeros(years.size, dtype=np.float64)
+    start_idx = np.searchsorted(years, start_year)
+    end_idx = np.searchsorted(years, end_year)
+    carbon_cost[start_idx : end_idx + 1] = np.linspace(
+        initial_carbon_cost, final_carbon_cost, num=end_year - start_year + 1
+    )
+    # From the end year onwards, the carbon cost is at its final value (also if start and end year coincide)
+    carbon_cost[end_idx:] = final_carbon_cost
+    return carbon_cost
+
+
+# Functions that build the carbon cost array for every model year, by trajectory type
+TRAJECTORY_BUILDERS = {
+    "constant": _build_constant,
+    "linear": _build_linear,
+}
+
+
 class CarbonCostTrajectory:
     """Class to define a yearly carbon cost trajectory."""
 
@@ -20,7 +59,9 @@ class CarbonCostTrajectory:
         self.model_years = model_years
         self.end_year = end_year
 
-        # Initialize DataFrame with carbon cost trajectory
+        # Initialize DataFrame with carbon cost trajectory, and its carbon cost in USD/tCO2 as array for the lookups by
+        #   model year
+        self.years = np.asarray(model_years, dtype=np.int64)
         self.df_carbon_cost = self.set_carbon_cost(
             trajectory=self.trajectory,
             initial_carbon_cost=initial_carbon_cost,
@@ -28,6 +69,7 @@ class CarbonCostTrajectory:
             start_year=start_year,
             end_year=end_year,
         )
+        self.carbon_cost = self.df_carbon_cost["carbon_cost"].to_numpy()
 
     def set_carbon_cost(
         self,
@@ -36,44 +78,32 @@ class CarbonCostTrajectory:
         final_carbon_cost: float,
         start_year: int,
         end_year: int,
-    ):
+    ) -> pd.DataFrame:
         """Set carbon cost trajectory in the form of a DataFrame with columns "year", "carbon_cost"
         Args:
-            trajectory: either of "constant", "linear", "cement"
+            trajectory: either of "constant", "linear"
             initial_carbon_cost: carbon cost in the start year in USD/tCO2
             final_carbon_cost: carbon cost in the end year in USD/tCO2
             start_year: year in which the carbon cost sets in
             end_year: year in which the carbon cost has reached its final value
         """
-        # Initialize DataFrame
-        df_carbon_cost = pd.DataFrame(
-            data={"year": self.model_years, "carbon_cost": None}
-        )
-
-        # Constant carbon cost
-        if trajectory == "constant":
-            df_carbon_cost.loc[df_carbon_cost["year"] < start_year, "carbon_cost"] = 0
-            df_carbon_cost.loc[
-                df_carbon_cost["year"] >= start_year, "carbon_cost"
-            ] = initial_carbon_cost
-
-        # Linear carbon cost
-        elif trajectory == "linear":
-            df_carbon_cost.loc[df_carbon_cost["year"] < start_year, "carbon_cost"] = 0
-            df_carbon_cost.loc[
-                df_carbon_cost["year"].between(start_year, end_year), "carbon_cost"
-            ] = np.linspace(
-                initial_carbon_cost, final_carbon_cost, num=end_year - start_year + 1
+        build_carbon_cost = TRAJECTORY_BUILDERS.get(trajectory)
+        if build_carbon_cost is None:
+            raise ValueError(
+                f"Carbon cost trajectory {trajectory} not in {list(TRAJECTORY_BUILDERS)}"
             )
-            df_carbon_cost.loc[
-                df_carbon_cost["year"] >= end_year, "carbon_cost"
-            ] = final_carbon_cost
-
-        df_carbon_cost = df_carbon_cost.astype(
-            dtype={"year": int, "carbon_cost": float}
+        carbon_cost = build_carbon_cost(
+            years=self.years,
+            initial_carbon_cost=initial_carbon_cost,
+            final_carbon_cost=final_carbon_cost,
+            start_year=start_year,
+            end_year=end_year,
         )
-
-        return df_carbon_cost
+        return pd.DataFrame(data={"year": self.years, "carbon_cost": carbon_cost})
 
     def get_carbon_cost(self, year: int) -> float:
-        return self.df_carbon_cost.set_index("year").loc[year, "carbon_cost"]
+        """Get carbon cost in USD/tCO2 in the given model year"""
+        idx = year - self.years[0]
+        if not 0 <= idx < self.years.size or self.years[idx] != year:
+            raise KeyError(year)
+        return self.carbon_cost[idx]
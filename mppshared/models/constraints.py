@@ -1,6 +1,7 @@
 """ Enforce constraints in the yearly optimization of technology switches."""
 
 import sys
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
@@ -12,6 +13,7 @@ from mppshared.config import (
     HYDRO_TECHNOLOGY_BAN,
     LOG_LEVEL,
 )
+from mppshared.import_data.intermediate_data import IntermediateDataImporter
 from mppshared.models.asset import AssetStack
 from mppshared.models.simulation_pathway import SimulationPathway
 from mppshared.utility.utils import get_logger
@@ -19,6 +21,45 @@ from mppshared.utility.utils import get_logger
 logger = get_logger(__name__)
 logger.setLevel(LOG_LEVEL)
 
+# Hydrogen required per unit of product in tH2/t
+H2_PER_PRODUCT = {
+    "Ammonia": H2_PER_AMMONIA,
+    "Urea": H2_PER_AMMONIA * AMMONIA_PER_UREA,
+    "Ammonium nitrate": H2_PER_AMMONIA * AMMONIA_PER_AMMONIUM_NITRATE,
+}
+
+# Regional production may fall short of the required minimum by this amount (half a unit in the second decimal)
+REGIONAL_PRODUCTION_TOLERANCE = 5e-3
+
+# Scope 1 and 2 emissions may exceed the annual carbon budget by this amount [Gt CO2] (half a unit in the second decimal)
+CARBON_BUDGET_TOLERANCE = 5e-3
+
+# Constraints ordered by the typical runtime of their check, cheapest first. New constraints need to be inserted
+#   according to their cost so that check_constraints with short_circuit=True fails as early as possible
+CONSTRAINTS_BY_COST = (
+    "regional_constraint",
+    "emissions_constraint",
+    "demand_share_constraint",
+    "rampup_constraint",
+    "electrolysis_capacity_addition_constraint",
+    "co2_storage_constraint",
+    "biomass_constraint",
+)
+
+
+@lru_cache(maxsize=None)
+def _sort_constraints_by_cost(constraints_to_apply: tuple) -> tuple:
+    """Order the constraints as in CONSTRAINTS_BY_COST, unknown constraints are checked last. Cached, since the same
+    few lists of constraints are sorted for every candidate transition"""
+    return tuple(
+        sorted(
+            constraints_to_apply,
+            key=lambda constraint: CONSTRAINTS_BY_COST.index(constraint)
+            if constraint in CONSTRAINTS_BY_COST
+            else len(CONSTRAINTS_BY_COST),
+        )
+    )
+
 
 def check_constraints(
     pathway: SimulationPathway,
@@ -28,6 +69,7 @@ def check_constraints(
     product: str,
     constraints_to_apply: list | None = None,
     region: str | None = None,
+    short_circuit: bool = False,
 ) -> dict:
     """Check all constraints for a given asset stack and return dictionary of Booleans with constraint types as keys.
 
@@ -41,31 +83,38 @@ def check_constraints(
             pathway.constraints_to_apply
         region: some constraints allow a regional and global checks to improve runtime. If a region is provided, these
             constraints will only check the constraint fulfilment in that region
+        short_circuit: if True, constraints are checked in the order of CONSTRAINTS_BY_COST and the check stops at the
+            first constraint that is hurt. Only use this if the caller does not need the values of all constraints
 
     Returns:
         Returns a dictionary with all constraints that have been checked and respective values (True if constraint
             satisfied, False if constraint hurt)
-    """
 
-    funcs_constraints = {
-        "emissions_constraint": check_annual_carbon_budget_constraint,
-        "rampup_constraint": check_technology_rampup_constraint,
-        "regional_constraint": check_constraint_regional_production,
-        "demand_share_constraint": check_global_demand_share_constraint,
-        "electrolysis_capacity_addition_constraint": check_electrolysis_capacity_addition_constraint,
-        "co2_storage_constraint": check_co2_storage_constraint,
-        "biomass_constraint": check_biomass_constraint,
-    }
+    Neither the pathway nor the stack are modified by the checks, so the stack can be a tentative AssetStack that
+    shares its assets with the stacks of the pathway.
+    """
 
     if constraints_to_apply is None:
         constraints_to_apply = pathway.constraints_to_apply
 
+    if short_circuit:
+        constraints_to_apply = list(
+            _sort_constraints_by_cost(tuple(constraints_to_apply))
+        )
+
     constraints_checked = {}
     if constraints_to_apply:
         # if the list is not empty
+        kwargs = dict(
+            pathway=pathway,
+            stack=stack,
+            product=product,
+            year=year,
+            transition_type=transition_type,
+        )
         for constraint in constraints_to_apply:
             if constraint == "emissions_constraint":
-                emissions_constraint, flag_residual = funcs_constraints[constraint](  # type: ignore
+                emissions_constraint, flag_residual = FUNCS_CONSTRAINTS[constraint](  # type: ignore
                     pathway=pathway,
                     stack=stack,
                     year=year,
@@ -73,23 +122,16 @@ def check_constraints(
                 )
                 constraints_checked[constraint] = emissions_constraint
                 constraints_checked["flag_residual"] = flag_residual
-            elif region is not None and constraint in ["co2_storage_constraint"]:
-                constraints_checked[constraint] = funcs_constraints[constraint](  # type: ignore
-                    pathway=pathway,
-                    stack=stack,
-                    product=product,
-                    year=year,
-                    transition_type=transition_type,
-                    region=region,
+            elif region is not None and constraint == "co2_storage_constraint":
+                constraints_checked[constraint] = FUNCS_CONSTRAINTS[constraint](  # type: ignore
+                    **kwargs, region=region
                 )
             else:
-                constraints_checked[constraint] = funcs_constraints[constraint](  # type: ignore
-                    pathway=pathway,
-                    stack=stack,
-                    product=product,
-                    year=year,
-                    transition_type=transition_type,
+                constraints_checked[constraint] = FUNCS_CONSTRAINTS[constraint](  # type: ignore
+                    **kwargs
                 )
+            if short_circuit and not constraints_checked[constraint]:
+                break
     else:
         logger.info(f"Pathway {pathway.pathway_name} has no constraints to apply")
 
@@ -114,42 +156,26 @@ def check_technology_rampup_constraint(
         year_old_stack = year - 1
     else:
         year_old_stack = year
-    df_old_stack = (
-        pathway.stacks[year_old_stack]
-        .aggregate_stack(aggregation_vars=["technology"])[["number_of_assets"]]
-        .rename({"number_of_assets": "number_old"}, axis=1)
-    )
-    df_new_stack = stack.aggregate_stack(aggregation_vars=["technology"])[
-        ["number_of_assets"]
-    ].rename({"number_of_assets": "number_new"}, axis=1)
-
-    # Create DataFrame for rampup comparison
-    df_rampup = (
-        df_old_stack.join(df_new_stack, how="outer")
-        .fillna(0)
-        .astype(dtype={"number_old": int, "number_new": int})
+    number_old = pathway.stacks[year_old_stack].get_number_of_assets_by_technology()
+    number_new = stack.get_number_of_assets_by_technology()
+
+    # Proposed asset additions for every technology in either stack, aligned in a single subtraction
+    proposed_asset_additions = number_new.sub(number_old, fill_value=0)
+    # Maximum asset additions in that year for every technology (NaN if the technology has no ramp-up constraint)
+    maximum_asset_additions = pathway.get_maximum_asset_additions(
+        year, proposed_asset_additions.index
     )
-    df_rampup["proposed_asset_additions"] = (
-        df_rampup["number_new"] - df_rampup["number_old"]
-    )
-    for technology in df_rampup.index:
-        rampup_constraint = pathway.technology_rampup[technology]  # type: ignore
-        if rampup_constraint:
-            df_rampup.loc[
-                technology, "maximum_asset_additions"
-            ] = rampup_constraint.df_rampup.loc[year, "maximum_asset_additions"]
-        else:
-            df_rampup.loc[technology, "maximum_asset_additions"] = np.nan
 
-    df_rampup["check"] = (
-        df_rampup["proposed_asset_additions"] <= df_rampup["maximum_asset_additions"]
-    ) | (df_rampup["maximum_asset_additions"].isna())
+    # Technologies without ramp-up constraint always fulfill it
+    check = np.isnan(maximum_asset_additions) | (
+        proposed_asset_additions.to_numpy() <= maximum_asset_additions
+    )
 
-    if df_rampup["check"].all():
+    if check.all():
         logger.info("Technology ramp-up constraint satisfied")
         return True
     else:
-        technology_affected = list(df_rampup[~df_rampup["check"]].index)
+        technology_affected = list(proposed_asset_additions.index[~check])
         logger.info(f"Technology ramp-up constraint hurt for {technology_affected}.")
         return False
 
@@ -166,9 +192,21 @@ def check_constraint_regional_production(
     logger.info(
         f"{year}: Checking regional production constraint (transition type: {transition_type})"
     )
-    df = get_regional_production_constraint_table(pathway, stack, product, year)
+    df = stack.get_regional_production_volume(product)
+
+    # Compare regional production with required demand share up to the regional production tolerance, working on
+    #   float64 arrays aligned via the region index (regions without demand get NaN) and computing the minimum in
+    #   place
+    production = df["annual_production_volume"].to_numpy(dtype=np.float64)
+    production_minimum = (
+        pathway.get_regional_demand_by_region(product=product, year=year)
+        .reindex(df["region"])
+        .to_numpy(dtype=np.float64, copy=True)
+    )
+    production_minimum *= pathway.get_regional_production_shares(df["region"])
+    production_minimum -= REGIONAL_PRODUCTION_TOLERANCE
     # The constraint is hurt if any region does not meet its required regional production share
-    if df["check"].all():
+    if np.greater_equal(production, production_minimum).all():
         logger.info("Regional production constraint satisfied")
         return True
     else:
@@ -176,33 +214,46 @@ def check_constraint_regional_production(
         return False
 
 
-def get_regional_production_constraint_table(
+def merge_regional_production_and_demand(
     pathway: SimulationPathway,
     stack: AssetStack,
     product: str,
     year: int,
 ) -> pd.DataFrame:
-    """Get table that compares regional production with regional demand for a given year"""
+    """Get table with annual production volume and demand for every region with production in the stack"""
 
     # Get regional production and demand
-    df_regional_production = stack.get_regional_production_volume(product)
-    df_demand = pathway.get_regional_demand(product=product, year=year)
+    df = stack.get_regional_production_volume(product)
+    demand = pathway.get_regional_demand_by_region(product=product, year=year)
+
+    # Align demand to the production regions via the region index (regions without demand get NaN)
+    df["demand"] = df["region"].map(demand)
+    return df
+
+
+def get_regional_production_constraint_table(
+    pathway: SimulationPathway,
+    stack: AssetStack,
+    product: str,
+    year: int,
+) -> pd.DataFrame:
+    """Get table that compares regional production with regional demand for a given year"""
 
     # Check for every region in DataFrame
-    df = df_regional_production.merge(df_demand, on=["region"], how="left")
-    df["share_regional_production"] = df["region"].map(
-        pathway.regional_production_shares
-    )
+    df = merge_regional_production_and_demand(pathway, stack, product, year)
+    share_regional_production = pathway.get_regional_production_shares(df["region"])
 
-    # Add required regional production column
-    df["annual_production_volume_minimum"] = (
-        df["demand"] * df["share_regional_production"]
+    # Add required regional production column, computed on arrays
+    production_minimum = (
+        df["demand"].to_numpy(dtype=np.float64) * share_regional_production
     )
+    df["share_regional_production"] = share_regional_production
+    df["annual_production_volume_minimum"] = production_minimum
 
-    # Compare regional production with required demand share up to specified number of significant figures
-    sf = 2
-    df["check"] = np.round(df["annual_production_volume"], sf) >= np.round(
-        df["annual_production_volume_minimum"], sf
+    # Compare regional production with required demand share up to the regional production tolerance
+    df["check"] = np.greater_equal(
+        df["annual_production_volume"].to_numpy(dtype=np.float64),
+        production_minimum - REGIONAL_PRODUCTION_TOLERANCE,
     )
     return df
 
@@ -226,9 +277,9 @@ def check_annual_carbon_budget_constraint(
     ):
         limit = pathway.carbon_budget.get_annual_emissions_limit(pathway.end_year)  # type: ignore
 
-        dict_stack_emissions = stack.calculate_emissions_stack(
+        co2_scope1_2 = stack.calculate_co2_scope1_2_stack(
             year=year,
-            df_emissions=pathway.emissions,
+            emission_intensities=pathway.emission_intensities,
             technology_classification="end-state",
         )
         flag_residual = True
@@ -237,34 +288,42 @@ def check_annual_carbon_budget_constraint(
     else:
         limit = pathway.carbon_budget.get_annual_emissions_limit(year=year)  # type: ignore
 
-        dict_stack_emissions = stack.calculate_emissions_stack(
-            year=year, df_emissions=pathway.emissions, technology_classification=None
+        co2_scope1_2 = stack.calculate_co2_scope1_2_stack(
+            year=year,
+            emission_intensities=pathway.emission_intensities,
+            technology_classification=None,
         )
         flag_residual = False
 
     # Compare scope 1 and 2 CO2 emissions to the allowed limit in that year
-    co2_scope1_2 = (
-        dict_stack_emissions["co2_scope1"] + dict_stack_emissions["co2_scope2"]
-    ) / 1e3
+    co2_scope1_2 /= 1e3
     # Unit co2_scope1_2: [Gt CO2]
 
-    if np.round(co2_scope1_2, 2) <= np.round(limit, 2):
+    if co2_scope1_2 <= limit + CARBON_BUDGET_TOLERANCE:
         logger.info(f"Annual carbon budget constraint is satisfied")
         return True, flag_residual
     logger.info(f"Annual carbon budget constraint is hurt")
     return False, flag_residual
 
 
+def _contains_substring(technologies: pd.Series, substring: str) -> np.ndarray:
+    """Boolean mask of the technologies whose name contains the substring"""
+    matches = [
+        technology
+        for technology in technologies.dropna().unique()
+        if substring in technology
+    ]
+    return technologies.isin(matches).to_numpy()
+
+
 def hydro_constraints(df_ranking: pd.DataFrame, sector: str) -> pd.DataFrame:
     # check if the product is aluminium:
     if HYDRO_TECHNOLOGY_BAN[sector]:
         logger.debug("Removing new builds Hydro")
-        return df_ranking[
-            ~(
-                df_ranking["technology_origin"].str.contains("New-build")
-                & df_ranking["technology_destination"].str.contains("Hydro")
-            )
-        ]
+        # Match the substrings on the few unique technology names, then look up every row
+        new_build = _contains_substring(df_ranking["technology_origin"], "New-build")
+        hydro = _contains_substring(df_ranking["technology_destination"], "Hydro")
+        return df_ranking[~(new_build & hydro)]
     else:
         return df_ranking
 
@@ -293,39 +352,39 @@ def check_global_demand_share_constraint(
     df_stack = stack.aggregate_stack(
         aggregation_vars=["product", "technology"]
     ).reset_index()
-    constraint = True
 
-    for technology in pathway.technologies_maximum_global_demand_share:  # type: ignore
-
-        # Calculate annual production volume based on CUF upper threshold
-        df = (
-            df_stack.loc[df_stack["technology"] == technology]
-            .groupby("product", as_index=False)
-            .sum()
-        )
-        df["annual_production_volume"] = (
-            df["annual_production_capacity"] * pathway.cuf_upper_threshold
-        )
+    # The aggregated stack has one row per product and technology, only keep the specified technologies
+    df_stack = df_stack.loc[
+        df_stack["technology"].isin(pathway.technologies_maximum_global_demand_share)  # type: ignore
+    ]
 
-        # Add global demand and corresponding constraint
-        df["demand"] = df["product"].apply(
-            lambda x: pathway.get_demand(product=x, year=year, region="Global")
-        )
-        df["demand_maximum"] = pathway.maximum_global_demand_share[year] * df["demand"]  # type: ignore
+    # Get global demand once for every product made with one of the specified technologies
+    demand_by_product = {
+        product: pathway.get_demand(product=product, year=year, region="Global")
+        for product in df_stack["product"].unique()
+    }
 
-        # Compare
-        df["check"] = np.where(
-            df["annual_production_volume"] <= df["demand_maximum"], True, False
+    # Compare annual production volume based on CUF upper threshold with the maximum share of global demand
+    production = (
+        df_stack["annual_production_capacity"].to_numpy() * pathway.cuf_upper_threshold
+    )
+    demand_maximum = (
+        pathway.maximum_global_demand_share[year]  # type: ignore
+        * df_stack["product"].map(demand_by_product).to_numpy()
+    )
+    hurt = ~(production <= demand_maximum)
+
+    if hurt.any():
+        technologies_hurt = set(df_stack["technology"].to_numpy()[hurt])
+        technology = next(
+            technology
+            for technology in pathway.technologies_maximum_global_demand_share  # type: ignore
+            if technology in technologies_hurt
         )
+        logger.debug(f"Maximum demand share hurt for technology {technology}.")
+        return False
 
-        if df["check"].all():
-            constraint = constraint & True
-
-        else:
-            logger.debug(f"Maximum demand share hurt for technology {technology}.")
-            return False
-
-    return constraint
+    return True
 
 
 def check_electrolysis_capacity_addition_constraint(
@@ -337,48 +396,104 @@ def check_electrolysis_capacity_addition_constraint(
 ) -> bool:
     """Check if the annual addition of electrolysis capacity fulfills the constraint"""
 
-    # Get annual production capacities per technology of current and tentative new stack
-    df_old_stack = (
-        pathway.stacks[year]
-        .aggregate_stack(
-            aggregation_vars=["product", "region", "technology"],
+    # Get required electrolysis capacity of current and tentative new stack
+    capacity_old_stack = get_pathway_electrolysis_capacity(pathway, year)
+    capacity_new_stack = get_electrolysis_capacity(stack, year, pathway)
+
+    # Compare to electrolysis capacity addition constraint in that year
+    capacity_addition = capacity_new_stack - capacity_old_stack
+    capacity_addition_constraint = pathway.electrolysis_capacity_addition_limits[year]
+
+    if capacity_addition <= capacity_addition_constraint:
+        return True
+
+    logger.debug("Annual electrolysis capacity addition constraint hurt.")
+    return False
+
+
+def get_pathway_electrolysis_capacity(pathway: SimulationPathway, year: int) -> float:
+    """Get the electrolysis capacity of the pathway's stack in a given year. This stack does not change while the
+    transitions of the year are checked, so the capacity is only computed again if the stack was changed."""
+    stack = pathway.stacks[year]
+    cached = pathway.electrolysis_capacity_by_year.get(year)
+    if cached is None or cached[0] is not stack or cached[1] != stack.version:
+        capacity = get_electrolysis_capacity(stack, year, pathway)
+        cached = (stack, stack.version, capacity)
+        pathway.electrolysis_capacity_by_year[year] = cached
+    return cached[2]
+
+
+def get_electrolysis_capacity(
+    stack: AssetStack, year: int, pathway: SimulationPathway
+) -> float:
+    """Get the total electrolysis capacity required by the electrolyser assets in the stack. Only these assets are
+    aggregated, and the conversion is skipped if there are none."""
+
+    # Get annual production capacities per product, region and technology of the electrolyser assets
+    electrolyser_assets = [
+        asset for asset in stack.assets if "Electrolyser" in asset.technology
+    ]
+    if not electrolyser_assets:
+        return 0.0
+    df_stack = (
+        AssetStack(
+            assets=electrolyser_assets,
+            emission_scopes=stack.emission_scopes,
+            ghgs=stack.ghgs,
+            cuf_lower_threshold=stack.cuf_lower_threshold,
         )
+        .aggregate_stack(aggregation_vars=["product", "region", "technology"])
         .reset_index()
     )
-    df_new_stack = stack.aggregate_stack(
-        aggregation_vars=["product", "region", "technology"]
-    ).reset_index()
 
-    # Calculate required electrolysis capacity
-    df_old_stack = convert_production_volume_to_electrolysis_capacity(
-        df_old_stack.loc[df_old_stack["technology"].str.contains("Electrolyser")],
-        year,
-        pathway,
-    )
-    df_new_stack = convert_production_volume_to_electrolysis_capacity(
-        df_new_stack.loc[df_new_stack["technology"].str.contains("Electrolyser")],
-        year,
-        pathway,
+    # Sum to total required electrolysis capacity
+    df_stack = convert_production_volume_to_electrolysis_capacity(
+        df_stack, year, pathway
     )
+    return df_stack["electrolysis_capacity"].sum()
 
-    # Sum to total required electrolysis capacity
-    capacity_old_stack = df_old_stack.sum()["electrolysis_capacity"]
-    capacity_new_stack = df_new_stack.sum()["electrolysis_capacity"]
 
-    # Compare to electrolysis capacity addition constraint in that year
-    capacity_addition = capacity_new_stack - capacity_old_stack
-    df_constr = (
-        pathway.importer.get_electrolysis_capacity_addition_constraint().set_index(
-            "year"
+def get_electrolyser_tables(
+    pathway: SimulationPathway,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Get the electrolyser tables of the pathway (see make_electrolyser_tables). The tables do not change during a
+    model run, so they are only read once per pathway and must not be modified"""
+    if pathway.electrolyser_tables is None:
+        pathway.electrolyser_tables = make_electrolyser_tables(pathway.importer)
+    return pathway.electrolyser_tables
+
+
+def make_electrolyser_tables(
+    importer: IntermediateDataImporter,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Make electrolyser capacity factors and hydrogen proportions indexed by product, region, technology and year, and
+    electrolyser efficiencies indexed by product, region and year"""
+    index_technology = ["product", "region", "technology", "year"]
+    index_region = ["product", "region", "year"]
+    electrolyser_cfs, electrolyser_effs, electrolyser_props = (
+        df.rename(columns={"technology_destination": "technology"})
+        for df in (
+            importer.get_electrolyser_cfs(),
+            importer.get_electrolyser_efficiencies(),
+            importer.get_electrolyser_proportions(),
         )
     )
-    capacity_addition_constraint = df_constr.loc[year, "value"]
-
-    if capacity_addition <= capacity_addition_constraint:
-        return True
 
-    logger.debug("Annual electrolysis capacity addition constraint hurt.")
-    return False
+    # Capacity factors and hydrogen proportions share the same keys, so they are joined into one lookup table
+    electrolyser_cfs_props = (
+        electrolyser_cfs[index_technology + ["electrolyser_capacity_factor"]]
+        .set_index(index_technology)
+        .join(
+            electrolyser_props[
+                index_technology + ["electrolyser_hydrogen_proportion"]
+            ].set_index(index_technology),
+            how="outer",
+        )
+    )
+    electrolyser_effs = electrolyser_effs[
+        index_region + ["electrolyser_efficiency"]
+    ].set_index(index_region)
+    return electrolyser_cfs_props, electrolyser_effs
 
 
 def convert_production_volume_to_electrolysis_capacity(
@@ -386,40 +501,18 @@ def convert_production_volume_to_electrolysis_capacity(
 ) -> float:
     """Convert a production volume in Mt into required electrolysis capacity in MW."""
 
-    # Get capacity factors, efficiencies and hydrogen proportions
-    electrolyser_cfs = pathway.importer.get_electrolyser_cfs().rename(
-        columns={"technology_destination": "technology"}
-    )
-    electrolyser_effs = pathway.importer.get_electrolyser_efficiencies().rename(
-        columns={"technology_destination": "technology"}
-    )
-    electrolyser_props = pathway.importer.get_electrolyser_proportions().rename(
-        columns={"technology_destination": "technology"}
-    )
+    # Get capacity factors, hydrogen proportions and efficiencies
+    electrolyser_cfs_props, electrolyser_effs = get_electrolyser_tables(pathway)
 
     # Add year to stack DataFrame
     df_stack = df_stack.copy()
     df_stack.loc[:, "year"] = year
 
-    # Merge with stack DataFrame
-    merge_vars1 = ["product", "region", "technology", "year"]
-    merge_vars2 = ["product", "region", "year"]
+    # Join with stack DataFrame
+    df_stack = df_stack.join(
+        electrolyser_cfs_props, on=["product", "region", "technology", "year"]
+    ).join(electrolyser_effs, on=["product", "region", "year"])
 
-    df_stack = df_stack.merge(
-        electrolyser_cfs[merge_vars1 + ["electrolyser_capacity_factor"]],
-        on=merge_vars1,
-        how="left",
-    )
-    df_stack = df_stack.merge(
-        electrolyser_effs[merge_vars2 + ["electrolyser_efficiency"]],
-        on=merge_vars2,
-        how="left",
-    )
-    df_stack = df_stack.merge(
-        electrolyser_props[merge_vars1 + ["electrolyser_hydrogen_proportion"]],
-        on=merge_vars1,
-        how="left",
-    )
     # Production volume needs to be based on standard CUF (user upper threshold)
     df_stack["annual_production_volume"] = (
         df_stack["annual_production_capacity"] * pathway.cuf_upper_threshold
@@ -433,18 +526,10 @@ def convert_production_volume_to_electrolysis_capacity(
         / (365 * 24 * df_stack["electrolyser_capacity_factor"])
     )
 
-    def choose_ratio(row: pd.Series) -> float:
-        if row["product"] == "Ammonia":
-            ratio = H2_PER_AMMONIA  # tH2/tNH3
-        elif row["product"] == "Urea":
-            ratio = H2_PER_AMMONIA * AMMONIA_PER_UREA
-        elif row["product"] == "Ammonium nitrate":
-            ratio = H2_PER_AMMONIA * AMMONIA_PER_AMMONIUM_NITRATE
-        return ratio
-
     # Electrolysis capacity in GW
-    df_stack["electrolysis_capacity"] = df_stack.apply(
-        lambda row: row["electrolysis_capacity"] * choose_ratio(row), axis=1
+    df_stack["electrolysis_capacity"] = (
+        df_stack["electrolysis_capacity"].to_numpy()
+        * df_stack["product"].map(H2_PER_PRODUCT).to_numpy()
     )
 
     return df_stack
@@ -482,25 +567,20 @@ def check_co2_storage_constraint(
             f"{year}: Checking CO2 storage constraint  (transition type: {transition_type})"
         )
 
-    # Get constraint value
+    # Get constraint value (by region for Clinker)
     if product == "Clinker":
-        df_co2_storage = pathway.co2_storage_constraint
-        limit = df_co2_storage.loc[df_co2_storage["year"] == year, :]
+        limit = pathway.co2_storage_limits_by_region.get(
+            year, pd.Series(dtype=np.float64)
+        )
     else:
-        df_co2_storage = pathway.co2_storage_constraint
-        if year < END_YEAR:
-            limit_year = year
-        else:
-            limit_year = END_YEAR
-
-        limit = df_co2_storage.loc[df_co2_storage["year"] == limit_year, "value"].item()
+        limit = pathway.co2_storage_limits[min(year, END_YEAR)]
 
     # Global constraint based on total CO2 storage available in that year
     if pathway.co2_storage_constraint_type == "annual_cumulative":
 
         # Calculate CO2 captured annually by the stack (Mt CO2)
         co2_captured = stack.calculate_co2_captured_stack(
-            year=year, df_emissions=pathway.emissions
+            year=year, emission_intensities=pathway.emission_intensities
         )
 
         # Compare with the limit on annual CO2 storage addition (MtCO2)
@@ -514,11 +594,11 @@ def check_co2_storage_constraint(
     elif pathway.co2_storage_constraint_type == "annual_addition":
         # Calculate new CO2 captured
         co2_captured_old_stack = pathway.stacks[year].calculate_co2_captured_stack(
-            year=year, df_emissions=pathway.emissions
+            year=year, emission_intensities=pathway.emission_intensities
         )
 
         co2_captured_new_stack = stack.calculate_co2_captured_stack(
-            year=year + 1, df_emissions=pathway.emissions
+            year=year + 1, emission_intensities=pathway.emission_intensities
         )
 
         additional_co2_captured = co2_captured_new_stack - co2_captured_old_stack
@@ -536,34 +616,28 @@ def check_co2_storage_constraint(
         modelled_years = pathway.stacks.keys()
 
         if region is None:
-            # check constraint fulfilment for all regions that have a CO2 storage constraint
-            dict_regional_fulfilment = {}
-            for region_to_check in limit.region.unique():
-                # get the cumulative sum of annually stored CO2 over all modelled years [Mt CO2]
-                co2_captured_storage = float(0)
-                for year in modelled_years:
-                    co2_captured_storage += stack.calculate_co2_captured_stack(
-                        year=year,
-                        df_emissions=pathway.emissions,
-                        region=region_to_check,
-                        usage_storage="storage",
-                        product=product,
-                    )
-
-                limit_region = limit.loc[
-                    limit["region"] == region_to_check, "value"
-                ].squeeze()
-
-                # add to dict (change sign of co2_captured_storage since captured emissions are provided as negative
-                #   values)
-                dict_regional_fulfilment[region_to_check] = (
-                    limit_region >= -co2_captured_storage
+            # get the cumulative sum of annually stored CO2 over all modelled years for all regions at once [Mt CO2]
+            co2_captured_storage = (
+                stack.calculate_cumulative_co2_captured_stack_by_region(
+                    years=modelled_years,
+                    emission_intensities=pathway.emission_intensities,
+                    usage_storage="storage",
+                    product=product,
                 )
+            )
 
-                if not return_dict:
+            # check constraint fulfilment for all regions that have a CO2 storage constraint (change sign of
+            #   co2_captured_storage since captured emissions are provided as negative values)
+            co2_captured_storage = -co2_captured_storage.reindex(
+                limit.index, fill_value=0
+            )
+            dict_regional_fulfilment = (limit >= co2_captured_storage).to_dict()
+
+            if not return_dict:
+                for region_to_check, fulfilment in dict_regional_fulfilment.items():
                     logger.debug(
-                        f"{region_to_check}: {dict_regional_fulfilment[region_to_check]} (limit: {limit_region} Mt CO2, "
-                        f"CCS volume: {-co2_captured_storage} Mt CO2)"
+                        f"{region_to_check}: {fulfilment} (limit: {limit[region_to_check]} Mt CO2, "
+                        f"CCS volume: {co2_captured_storage[region_to_check]} Mt CO2)"
                     )
 
             if return_dict:
@@ -578,16 +652,14 @@ def check_co2_storage_constraint(
         else:
             # check constraint fulfilment for one region only
             # get the cumulative sum of annually stored CO2 over all modelled years [Mt CO2]
-            co2_captured_storage = float(0)
-            for year in modelled_years:
-                co2_captured_storage += stack.calculate_co2_captured_stack(
-                    year=year,
-                    df_emissions=pathway.emissions,
-                    region=region,
-                    usage_storage="storage",
-                    product=product,
-                )
-            limit_region = limit.loc[limit["region"] == region, "value"].squeeze()
+            co2_captured_storage = stack.calculate_cumulative_co2_captured_stack(
+                years=modelled_years,
+                emission_intensities=pathway.emission_intensities,
+                region=region,
+                usage_storage="storage",
+                product=product,
+            )
+            limit_region = limit.at[region]
 
             # check fulfilment (change sign of co2_captured_storage since captured emissions are provided as negative
             #   values)
@@ -623,10 +695,7 @@ def check_biomass_constraint(
     )
 
     # Get constraint value
-    df_biomass_limit = pathway.biomass_constraint
-    bio_limit = df_biomass_limit.loc[
-        (df_biomass_limit["year"] == year), "value"
-    ].squeeze()
+    bio_limit = pathway.biomass_limits[year]
 
     # get biomass consumption
     df_biomass_consumption = pathway.df_biomass_consumption
@@ -634,38 +703,33 @@ def check_biomass_constraint(
         (df_biomass_consumption["year"] == year), :
     ]
 
-    # get regions and technologies with biomass consumption in the current year
-    technologies = df_biomass_consumption["technology_destination"].unique()
-    regions = df_biomass_consumption["region"].unique()
-
-    # get annual production volumes per region and technology
-    df_list = []
-    for region in regions:
-        df_prod_volume = dict.fromkeys(technologies)
-        for technology in technologies:
-            # get annual production volume in [Mt Clk] and convert to [t Clk]
-            df_prod_volume[technology] = (
-                stack.get_annual_production_volume(
-                    product=product, region=region, technology=technology
-                )
-                * 1e6
-            )
-        df_prod_volume = pd.DataFrame.from_dict(
-            data=df_prod_volume, orient="index"
-        ).reset_index()
-        df_prod_volume.columns = ["technology_destination", "value"]  # type: ignore
-        df_prod_volume["region"] = region
-        df_list.append(df_prod_volume)
-    df_prod_volume = pd.concat(df_list, axis=0).set_index(
-        ["region", "technology_destination"]
+    # get annual production volumes per region and technology in [Mt Clk] with a single aggregation of the stack,
+    #   aligned with the biomass consumption of each region and technology
+    df_stack = stack.aggregate_stack(
+        aggregation_vars=["region", "technology"], product=product
     )
+    if df_stack.empty:
+        production_volume = np.zeros(len(df_biomass_consumption))
+    else:
+        production_volume = (
+            df_stack["annual_production_volume"]
+            .reindex(
+                pd.MultiIndex.from_arrays(
+                    [
+                        df_biomass_consumption["region"],
+                        df_biomass_consumption["technology_destination"],
+                    ]
+                ),
+                fill_value=0,
+            )
+            .to_numpy(dtype=np.float64)
+        )
 
-    # multiply and sum
-    df_biomass_consumption = df_biomass_consumption[
-        ["region", "technology_destination", "value"]
-    ].set_index(["region", "technology_destination"])
-    biomass_consumption = (
-        df_prod_volume.mul(df_biomass_consumption).sum(axis=0).squeeze()  # type: ignore
+    # convert to [t Clk], multiply and sum
+    biomass_consumption = np.nansum(
+        production_volume
+        * 1e6
+        * df_biomass_consumption["value"].to_numpy(dtype=np.float64)
     )
 
     # check limit
@@ -680,3 +744,15 @@ def check_biomass_constraint(
     else:
         logger.info("Biomass constraint hurt")
     return check
+
+
+# Functions to check each constraint, referenced by the names used in constraints_to_apply
+FUNCS_CONSTRAINTS = {
+    "emissions_constraint": check_annual_carbon_budget_constraint,
+    "rampup_constraint": check_technology_rampup_constraint,
+    "regional_constraint": check_constraint_regional_production,
+    "demand_share_constraint": check_global_demand_share_constraint,
+    "electrolysis_capacity_addition_constraint": check_electrolysis_capacity_addition_constraint,
+    "co2_storage_constraint": check_co2_storage_constraint,
+    "biomass_constraint": check_biomass_constraint,
+}
@@ -1,19 +1,22 @@
 from collections import defaultdict
 from copy import deepcopy
+from functools import cached_property
 
 import numpy as np
 import pandas as pd
-import plotly.express as px
 from mppshared.config import LOG_LEVEL
 from mppshared.import_data.intermediate_data import IntermediateDataImporter
-from mppshared.models.asset import Asset, AssetStack, create_assets
+from mppshared.models.asset import (
+    Asset,
+    AssetStack,
+    create_assets,
+    make_emission_intensities,
+)
 from mppshared.models.carbon_budget import CarbonBudget
 from mppshared.models.carbon_cost_trajectory import CarbonCostTrajectory
 from mppshared.models.transition import TransitionRegistry
 from mppshared.utility.dataframe_utility import flatten_columns
 from mppshared.utility.utils import get_logger
-from plotly.offline import plot
-from plotly.subplots import make_subplots
 
 logger = get_logger(__name__)
 logger.setLevel(LOG_LEVEL)
@@ -67,6 +70,13 @@ class SimulationPathway:
         self.annual_renovation_share = annual_renovation_share
         self.ghgs = ghgs
         self.regional_production_shares = regional_production_shares
+        # Regional production shares as array indexed by region, regions without a share map to the trailing NaN
+        self.region_index = {
+            region: i for i, region in enumerate(regional_production_shares.keys())
+        }
+        self.regional_production_shares_array = np.append(
+            np.array(list(regional_production_shares.values()), dtype=float), np.nan
+        )
         self.constraints_to_apply = constraints_to_apply
         self.year_2050_emissions_constraint = year_2050_emissions_constraint
         self.technologies_maximum_global_demand_share = (
@@ -79,6 +89,14 @@ class SimulationPathway:
 
         # Technology ramp-up is a dictionary with the technologies as keys
         self.technology_rampup = technology_rampup
+        if technology_rampup is not None:
+            # Maximum asset additions as array with years as rows and technologies as columns
+            self.technology_rampup_index = {
+                technology: i for i, technology in enumerate(technology_rampup)
+            }
+            self.maximum_asset_additions_array = (
+                self.get_maximum_asset_additions_table().to_numpy()
+            )
 
         # Use importer to get all data required for simulating the pathway
         self.importer = IntermediateDataImporter(
@@ -97,6 +115,9 @@ class SimulationPathway:
 
         if set_biomass_constraint:
             self.biomass_constraint = self.importer.get_biomass_constraint()
+            self.biomass_limits = dict(
+                zip(self.biomass_constraint["year"], self.biomass_constraint["value"])
+            )
             self.df_biomass_consumption = self.get_biomass_consumption()
 
         self.assumed_annual_production_capacity = assumed_annual_production_capacity
@@ -107,10 +128,23 @@ class SimulationPathway:
             self.stacks = self.make_initial_asset_stack_from_regional_data()
         elif self.initial_asset_data_level == "individual_assets":
             self.stacks = self.make_initial_asset_stack_from_asset_data()
+        # Electrolysis capacity of the stack in each year, stored with the stack and stack version it was computed for
+        self.electrolysis_capacity_by_year: dict = {}
+        # Electrolyser capacity factors, hydrogen proportions and efficiencies, read on first use
+        self.electrolyser_tables: tuple | None = None
 
         # Import demand for all regions
         logger.debug("Getting demand")
         self.demand = self.importer.get_demand(region=None)
+        # Demand by (product, year, region) and all regions with demand, for fast lookups of single values
+        self.demand_by_key = dict(
+            zip(
+                zip(self.demand["product"], self.demand["year"], self.demand["region"]),
+                self.demand["value"],
+            )
+        )
+        self.demand_regions = self.demand["region"].unique()
+        self._regional_demand_cache: dict = {}
 
         # Import ranking of technology transitions for all transition types
         logger.debug("Getting rankings")
@@ -119,6 +153,8 @@ class SimulationPathway:
         # Import emissions data
         logger.debug("Getting emissions")
         self.emissions = self.importer.get_process_data(data_type="emissions")
+        # Emission intensities by year, emission column and (technology, product, region) for the stack emissions
+        self.emission_intensities = make_emission_intensities(self.emissions)
 
         # Import technology characteristics
         logger.debug("Getting technology characteristics")
@@ -225,6 +261,10 @@ class SimulationPathway:
         self, df_roadmap: pd.DataFrame, technology_layout: dict | None = None
     ):
         """Plot the technology roadmap and save as .html"""
+        # Plotly is only needed for the output, so import it here to keep the pathway simulation lightweight
+        import plotly.express as px
+        from plotly.offline import plot
+        from plotly.subplots import make_subplots
 
         # remove technologies without production volume
         df_roadmap = df_roadmap.set_index("technology")
@@ -322,20 +362,81 @@ class SimulationPathway:
         region: str,
     ):
         """Get the demand for a product in a given year and region"""
+        return self.demand_by_key[(product, year, region)]
+
+    def get_maximum_asset_additions(self, year: int, technologies) -> np.ndarray:
+        """Get the maximum asset additions in a year for each of the technologies (NaN for technologies without
+        ramp-up constraint)"""
+        idx = year - self.start_year
+        if not 0 <= idx < self.maximum_asset_additions_array.shape[0]:
+            raise KeyError(year)
+        return self.maximum_asset_additions_array[
+            idx,
+            [self.technology_rampup_index[technology] for technology in technologies],
+        ]
 
-        df = self.demand
-        return df.loc[
-            (df["product"] == product)
-            & (df["year"] == year)
-            & (df["region"] == region),
-            "value",
-        ].item()
+    def get_maximum_asset_additions_table(self) -> pd.DataFrame:
+        """Get maximum asset additions from the technology ramp-up with years as index and technologies as columns
+        (NaN for technologies without ramp-up constraint)"""
+        return pd.DataFrame(
+            {
+                technology: rampup_constraint.df_rampup["maximum_asset_additions"]
+                if rampup_constraint
+                else np.nan
+                for technology, rampup_constraint in self.technology_rampup.items()  # type: ignore
+            },
+            index=np.arange(self.start_year, self.end_year + 1),
+            dtype=np.float64,
+        )
+
+    def get_regional_production_shares(self, regions) -> np.ndarray:
+        """Get the required regional production share for each of the regions (NaN for regions without a share)"""
+        return self.regional_production_shares_array[
+            [self.region_index.get(region, -1) for region in regions]
+        ]
 
     def get_regional_demand(self, product: str, year: int):
-        df = self.demand
         return pd.DataFrame(
             {"region": region, "demand": self.get_demand(product, year, region)}
-            for region in df["region"].unique()
+            for region in self.demand_regions
+        )
+
+    def get_regional_demand_by_region(self, product: str, year: int) -> pd.Series:
+        """Get the demand for a product in a given year with the regions as index. The demand does not change during
+        a model run, so the Series is only built once per product and year and must not be modified"""
+        if (product, year) not in self._regional_demand_cache:
+            self._regional_demand_cache[(product, year)] = self.get_regional_demand(
+                product=product, year=year
+            ).set_index("region")["demand"]
+        return self._regional_demand_cache[(product, year)]
+
+    @cached_property
+    def co2_storage_limits(self) -> dict:
+        """CO2 storage limit by year, read from the CO2 storage constraint on first use"""
+        return dict(
+            zip(
+                self.co2_storage_constraint["year"],
+                self.co2_storage_constraint["value"],
+            )
+        )
+
+    @cached_property
+    def co2_storage_limits_by_region(self) -> dict:
+        """CO2 storage limit by year with the regions as index, for a CO2 storage constraint given by region"""
+        return {
+            year: df.set_index("region")["value"]
+            for year, df in self.co2_storage_constraint.groupby("year")
+        }
+
+    @cached_property
+    def electrolysis_capacity_addition_limits(self) -> dict:
+        """Limit on annual electrolysis capacity addition by year. Read on first use, so that the constraint can also
+        be checked if it is not part of the pathway's constraints_to_apply"""
+        df_electrolysis_constraint = (
+            self.importer.get_electrolysis_capacity_addition_constraint()
+        )
+        return dict(
+            zip(df_electrolysis_constraint["year"], df_electrolysis_constraint["value"])
         )
 
     def get_biomass_consumption(self):
@@ -34,6 +34,12 @@ class TechnologyRampup:
                 year to the next
             curve_type: "exponential" or "rayleigh"
         """
+        # A ramp-up that is already underway in the model start year cannot be represented
+        if ramp_up_start_year < model_start_year <= ramp_up_end_year:
+            raise ValueError(
+                f"Ramp-up of {technology} starts in {ramp_up_start_year}, before the model start year "
+                f"{model_start_year}"
+            )
         self.model_start_year = model_start_year
         self.model_end_year = model_end_year
         self.technology = technology
@@ -57,27 +63,24 @@ class TechnologyRampup:
                 first years after steep incline. After the maximum, the curve rapidly declines convexly to the baseline.
         """
 
+        # Maximum asset additions are NaN (unconstrained) outside of the ramp-up period
         df_rampup = pd.DataFrame(
+            data={"maximum_asset_additions": np.nan},
             index=np.arange(self.model_start_year, self.model_end_year + 1),
-            columns=["maximum_asset_additions"],
+            dtype=np.float64,
         )
-        df_rampup = df_rampup.astype(dtype={"maximum_asset_additions": float})
 
         # exponential
         if self.curve_type == "exponential":
-            for year in np.arange(self.model_start_year, self.model_end_year + 1):
-                if year == self.ramp_up_start_year:
-                    df_rampup.loc[year, "maximum_asset_additions"] = float(
-                        self.init_maximum_asset_additions
-                    )
-                elif year in np.arange(
-                    self.ramp_up_start_year + 1, self.ramp_up_end_year + 1
-                ):
-                    df_rampup.loc[year, "maximum_asset_additions"] = df_rampup.loc[
-                        year - 1, "maximum_asset_additions"
-                    ] * (1 + self.maximum_asset_growth_rate)
-                else:
-                    df_rampup.loc[year, "maximum_asset_additions"] = np.nan
+            if self.model_start_year <= self.ramp_up_start_year <= self.model_end_year:
+                # Grow the initial maximum asset additions by the growth rate in every year of the ramp-up
+                idx_start = self.ramp_up_start_year - self.model_start_year
+                idx_end = max(self.ramp_up_end_year - self.model_start_year, idx_start)
+                growth = np.full(
+                    idx_end - idx_start + 1, 1 + self.maximum_asset_growth_rate
+                )
+                growth[0] = float(self.init_maximum_asset_additions)
+                df_rampup.iloc[idx_start : idx_end + 1, 0] = np.cumprod(growth)
 
         # rayleigh
         elif self.curve_type == "rayleigh":
@@ -103,6 +106,6 @@ class TechnologyRampup:
         else:
             sys.exit(f"Unknown ramp up curve type provided: {self.curve_type}")
 
-        df_rampup = df_rampup.apply(lambda x: np.round(x, decimals=0))
+        df_rampup = df_rampup.round(decimals=0)
 
         return df_rampup
@@ -0,0 +1,188 @@
+from copy import deepcopy
+
+import pandas as pd
+import pytest
+
+from mppshared.agent_logic.agent_logic_functions import (
+    decrease_cuf_of_assets,
+    increase_cuf_of_assets,
+)
+from mppshared.models.asset import Asset, AssetStack
+
+YEAR = 2025
+
+
+def make_asset(technology: str, region: str, cuf: float = 0.8) -> Asset:
+    return Asset(
+        product="Ammonia",
+        technology=technology,
+        region=region,
+        year_commissioned=2020,
+        annual_production_capacity=1.0,
+        cuf=cuf,
+        asset_lifetime=30,
+        technology_classification="initial",
+        emission_scopes=["scope1", "scope2"],
+        cuf_lower_threshold=0.5,
+        ghgs=["co2"],
+    )
+
+
+def make_stack() -> AssetStack:
+    return AssetStack(
+        assets=[
+            make_asset("Coal Gasification", "China"),
+            make_asset("Natural Gas SMR", "China"),
+            make_asset("Natural Gas SMR", "Europe"),
+        ],
+        emission_scopes=["scope1", "scope2"],
+        ghgs=["co2"],
+        cuf_lower_threshold=0.5,
+    )
+
+
+def production_by_technology(stack: AssetStack) -> dict:
+    return stack.aggregate_stack(aggregation_vars=["technology"])[
+        "annual_production_volume"
+    ].to_dict()
+
+
+def production_by_region(stack: AssetStack) -> dict:
+    df = stack.get_regional_production_volume("Ammonia")
+    return dict(zip(df["region"], df["annual_production_volume"]))
+
+
+class StackPathway:
+    """Provides the stack and asset costs used by the CUF adjustments"""
+
+    def __init__(self, stack: AssetStack):
+        self.stack = stack
+        self.df_cost = pd.DataFrame(
+            {
+                "product": "Ammonia",
+                "technology_origin": "New-build",
+                "year": YEAR,
+                "region": ["China", "China", "Europe"],
+                "technology_destination": [
+                    "Coal Gasification",
+                    "Natural Gas SMR",
+                    "Natural Gas SMR",
+                ],
+                "lcox": [300.0, 400.0, 500.0],
+            }
+        )
+
+    def get_stack(self, year: int) -> AssetStack:
+        return self.stack
+
+
+def test_append_invalidates_cache():
+    stack = make_stack()
+    assert production_by_region(stack) == pytest.approx({"China": 1.6, "Europe": 0.8})
+    stack.append(make_asset("Natural Gas SMR", "India"))
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(2.4)
+    assert production_by_region(stack)["India"] == pytest.approx(0.8)
+
+
+def test_remove_invalidates_cache():
+    stack = make_stack()
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(1.6)
+    production_by_region(stack)
+    stack.remove(stack.filter_assets(region="Europe")[0])
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(0.8)
+    assert "Europe" not in production_by_region(stack)
+
+
+def test_update_asset_invalidates_cache():
+    stack = make_stack()
+    assert "Electrolyser" not in production_by_technology(stack)
+    stack.update_asset(
+        year=YEAR,
+        asset_to_update=stack.filter_assets(technology="Coal Gasification")[0],
+        new_technology="Electrolyser",
+        new_classification="end-state",
+        asset_lifetime=30,
+        switch_type="brownfield_renovation",
+        origin_technology="Coal Gasification",
+        update_year_commission=False,
+    )
+    assert production_by_technology(stack) == pytest.approx(
+        {"Electrolyser": 0.8, "Natural Gas SMR": 1.6}
+    )
+
+
+def test_direct_asset_change_requires_invalidate_cache():
+    stack = make_stack()
+    assert production_by_region(stack)["Europe"] == pytest.approx(0.8)
+    stack.filter_assets(region="Europe")[0].cuf = 0.6
+    stack.invalidate_cache()
+    assert production_by_region(stack)["Europe"] == pytest.approx(0.6)
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(1.4)
+
+
+def test_increase_cuf_of_assets_invalidates_cache():
+    stack = make_stack()
+    assert production_by_technology(stack)["Coal Gasification"] == pytest.approx(0.8)
+    assert production_by_region(stack)["China"] == pytest.approx(1.6)
+    increase_cuf_of_assets(
+        pathway=StackPathway(stack),
+        demand=2.6,
+        product="Ammonia",
+        year=YEAR,
+        cost_metric="lcox",
+        cuf_upper_threshold=0.95,
+    )
+    # The cheapest asset is increased first, the following one until demand is met
+    assert production_by_technology(stack) == pytest.approx(
+        {"Coal Gasification": 0.95, "Natural Gas SMR": 1.75}
+    )
+    assert production_by_region(stack)["China"] == pytest.approx(1.9)
+
+
+def test_decrease_cuf_of_assets_invalidates_cache():
+    stack = make_stack()
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(1.6)
+    assert production_by_region(stack)["Europe"] == pytest.approx(0.8)
+    decrease_cuf_of_assets(
+        pathway=StackPathway(stack),
+        demand=2.2,
+        product="Ammonia",
+        year=YEAR,
+        cost_metric="lcox",
+        cuf_lower_threshold=0.5,
+    )
+    # The most expensive asset is decreased first
+    assert production_by_technology(stack)["Natural Gas SMR"] == pytest.approx(1.3)
+    assert production_by_region(stack)["Europe"] == pytest.approx(0.5)
+
+
+def test_tentative_update_leaves_stack_unchanged():
+    stack = make_stack()
+    assert production_by_technology(stack)["Coal Gasification"] == pytest.approx(0.8)
+
+    # Tentative stack as in the brownfield transitions
+    tentative_stack = AssetStack(
+        assets=list(stack.assets),
+        emission_scopes=stack.emission_scopes,
+        ghgs=stack.ghgs,
+        cuf_lower_threshold=stack.cuf_lower_threshold,
+    )
+    asset_to_update = stack.filter_assets(technology="Coal Gasification")[0]
+    tentative_stack.update_asset(
+        year=YEAR,
+        asset_to_update=deepcopy(asset_to_update),
+        new_technology="Electrolyser",
+        new_classification="end-state",
+        asset_lifetime=30,
+        switch_type="brownfield_renovation",
+        origin_technology="Coal Gasification",
+        update_year_commission=False,
+    )
+    tentative_stack.append(make_asset("Natural Gas SMR", "India"))
+
+    assert asset_to_update.technology == "Coal Gasification"
+    assert len(stack.assets) == 3
+    assert production_by_technology(stack)["Coal Gasification"] == pytest.approx(0.8)
+    assert production_by_technology(tentative_stack)["Electrolyser"] == pytest.approx(
+        0.8
+    )
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mppshared.models.carbon_budget import (
+    CarbonBudget,
+    CarbonBudgetInfeasibleError,
+    linear_emissions_pathway,
+)
+
+SECTORAL_CARBON_PATHWAYS = {
+    "aluminium": {
+        "emissions_start": 0.62,
+        "emissions_end": 0.031,
+        "action_start": 2023,
+    },
+    "cement": {"emissions_start": 2.8, "emissions_end": 0.2079, "action_start": 2022},
+}
+
+
+def test_linear_emissions_pathway():
+    values = linear_emissions_pathway(
+        start_year=2020,
+        end_year=2050,
+        action_start=2023,
+        emissions_start=0.62,
+        emissions_end=0.031,
+    )
+    assert len(values) == 31
+    assert (values[:4] == 0.62).all()
+    assert values[-1] == pytest.approx(0.031)
+    assert (values[3:][1:] < values[3:][:-1]).all()
+
+
+def make_linear_carbon_budget(budget: float) -> CarbonBudget:
+    return CarbonBudget(
+        start_year=2020,
+        end_year=2050,
+        sectoral_carbon_budgets={"aluminium": budget},
+        pathway_shape="linear",
+        sector="aluminium",
+        carbon_budget_sector_csv=False,
+        sectoral_carbon_pathway=SECTORAL_CARBON_PATHWAYS["aluminium"],
+        importer=None,
+    )
+
+
+def test_linear_carbon_budget():
+    carbon_budget = make_linear_carbon_budget(budget=11)
+    assert carbon_budget.get_annual_emissions_limit(2020) == pytest.approx(0.62)
+    assert carbon_budget.get_annual_emissions_limit(2050) == pytest.approx(0.031)
+    with pytest.raises(KeyError):
+        carbon_budget.get_annual_emissions_limit(2051)
+
+
+def test_linear_carbon_budget_infeasible():
+    with pytest.raises(CarbonBudgetInfeasibleError) as exc_info:
+        make_linear_carbon_budget(budget=5)
+    assert exc_info.value.sector == "aluminium"
+
+
+class CarbonBudgetImporter:
+    def __init__(self, df_carbon_budget: pd.DataFrame):
+        self.df_carbon_budget = df_carbon_budget
+
+    def get_carbon_budget(self) -> pd.DataFrame:
+        return self.df_carbon_budget.copy()
+
+
+def make_csv_carbon_budget(df_carbon_budget: pd.DataFrame) -> CarbonBudget:
+    return CarbonBudget(
+        start_year=2020,
+        end_year=2050,
+        sectoral_carbon_budgets={"aluminium": 11},
+        pathway_shape="linear",
+        sector="aluminium",
+        carbon_budget_sector_csv=True,
+        sectoral_carbon_pathway=SECTORAL_CARBON_PATHWAYS["aluminium"],
+        importer=CarbonBudgetImporter(df_carbon_budget),
+    )
+
+
+def test_csv_carbon_budget():
+    carbon_budget = make_csv_carbon_budget(
+        pd.DataFrame({"year": [2020, 2021, 2022], "annual_limit": [0.6, 0.5, 0.4]})
+    )
+    assert carbon_budget.get_annual_emissions_limit(2021) == pytest.approx(0.5)
+
+
+def test_csv_carbon_budget_missing_year():
+    with pytest.raises(ValueError, match=r"missing the years \[2021\]"):
+        make_csv_carbon_budget(
+            pd.DataFrame({"year": [2020, 2022], "annual_limit": [0.6, 0.4]})
+        )
+
+
+def test_csv_carbon_budget_nan_limit():
+    with pytest.raises(
+        ValueError, match=r"NaN as annual emissions limit for the years \[2021\]"
+    ):
+        make_csv_carbon_budget(
+            pd.DataFrame(
+                {"year": [2020, 2021, 2022], "annual_limit": [0.6, np.nan, 0.4]}
+            )
+        )
+
+
+def test_csv_carbon_budget_duplicated_year():
+    with pytest.raises(
+        ValueError, match=r"several annual emissions limits for the years \[2021\]"
+    ):
+        make_csv_carbon_budget(
+            pd.DataFrame(
+                {"year": [2020, 2021, 2021, 2022], "annual_limit": [0.6, 0.5, 0.5, 0.4]}
+            )
+        )
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mppshared.models.carbon_cost_trajectory import CarbonCostTrajectory
+
+MODEL_YEARS = np.arange(2020, 2051)
+
+
+def test_constant_carbon_cost():
+    trajectory = CarbonCostTrajectory(
+        trajectory="constant",
+        initial_carbon_cost=50,
+        final_carbon_cost=50,
+        start_year=2025,
+        end_year=2035,
+        model_years=MODEL_YEARS,
+    )
+    assert trajectory.get_carbon_cost(2024) == 0
+    assert trajectory.get_carbon_cost(2025) == 50
+    assert trajectory.get_carbon_cost(2050) == 50
+
+
+def test_linear_carbon_cost():
+    trajectory = CarbonCostTrajectory(
+        trajectory="linear",
+        initial_carbon_cost=0,
+        final_carbon_cost=100,
+        start_year=2025,
+        end_year=2035,
+        model_years=MODEL_YEARS,
+    )
+    assert trajectory.get_carbon_cost(2020) == 0
+    assert trajectory.get_carbon_cost(2030) == pytest.approx(50)
+    assert trajectory.get_carbon_cost(2035) == 100
+    assert trajectory.get_carbon_cost(2050) == 100
+
+
+def test_set_carbon_cost_returns_dataframe():
+    trajectory = CarbonCostTrajectory(
+        trajectory="linear",
+        initial_carbon_cost=0,
+        final_carbon_cost=100,
+        start_year=2025,
+        end_year=2035,
+        model_years=MODEL_YEARS,
+    )
+    df_carbon_cost = trajectory.set_carbon_cost(
+        trajectory="constant",
+        initial_carbon_cost=50,
+        final_carbon_cost=50,
+        start_year=2030,
+        end_year=2035,
+    )
+    assert isinstance(df_carbon_cost, pd.DataFrame)
+    assert list(df_carbon_cost.columns) == ["year", "carbon_cost"]
+    assert df_carbon_cost["year"].tolist() == MODEL_YEARS.tolist()
+    assert df_carbon_cost["carbon_cost"].dtype == np.float64
+    assert df_carbon_cost.set_index("year")["carbon_cost"].loc[
+        [2029, 2030]
+    ].tolist() == [0, 50]
+
+    # The trajectory keeps the DataFrame of the trajectory it was initialized with
+    assert list(trajectory.df_carbon_cost.columns) == ["year", "carbon_cost"]
+    assert trajectory.df_carbon_cost["carbon_cost"].tolist() == list(
+        trajectory.carbon_cost
+    )
+
+
+def test_linear_carbon_cost_start_equals_end_year():
+    trajectory = CarbonCostTrajectory(
+        trajectory="linear",
+        initial_carbon_cost=20,
+        final_carbon_cost=100,
+        start_year=2025,
+        end_year=2025,
+        model_years=MODEL_YEARS,
+    )
+    assert trajectory.get_carbon_cost(2024) == 0
+    assert trajectory.get_carbon_cost(2025) == 100
+    assert trajectory.get_carbon_cost(2050) == 100
+
+
+def test_unknown_carbon_cost_trajectory():
+    with pytest.raises(ValueError):
+        CarbonCostTrajectory(
+            trajectory="exponential",
+            initial_carbon_cost=0,
+            final_carbon_cost=100,
+            start_year=2025,
+            end_year=2035,
+            model_years=MODEL_YEARS,
+        )
+
+
+def test_get_carbon_cost_outside_model_years():
+    trajectory = CarbonCostTrajectory(
+        trajectory="constant",
+        initial_carbon_cost=50,
+        final_carbon_cost=50,
+        start_year=2025,
+        end_year=2035,
+        model_years=MODEL_YEARS,
+    )
+    with pytest.raises(KeyError):
+        trajectory.get_carbon_cost(2051)
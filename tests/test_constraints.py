@@ -0,0 +1,388 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mppshared.models.asset import Asset, AssetStack, make_emission_intensities
+from mppshared.models.constraints import (
+    check_biomass_constraint,
+    check_co2_storage_constraint,
+    check_constraint_regional_production,
+    check_constraints,
+    check_global_demand_share_constraint,
+    get_regional_production_constraint_table,
+    hydro_constraints,
+    merge_regional_production_and_demand,
+)
+from mppshared.models.simulation_pathway import SimulationPathway
+
+YEAR = 2025
+
+
+def make_asset(
+    technology: str, region: str, cuf: float = 0.8, product: str = "Ammonia"
+) -> Asset:
+    return Asset(
+        product=product,
+        technology=technology,
+        region=region,
+        year_commissioned=2020,
+        annual_production_capacity=1.0,
+        cuf=cuf,
+        asset_lifetime=30,
+        technology_classification="initial",
+        emission_scopes=["scope1", "scope2"],
+        cuf_lower_threshold=0.5,
+        ghgs=["co2"],
+    )
+
+
+def make_stack(assets: list[Asset]) -> AssetStack:
+    return AssetStack(
+        assets=assets,
+        emission_scopes=["scope1", "scope2"],
+        ghgs=["co2"],
+        cuf_lower_threshold=0.5,
+    )
+
+
+class ElectrolysisImporter:
+    """Provides the electrolysis capacity addition constraint of the pathway"""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+
+    def get_electrolysis_capacity_addition_constraint(self) -> pd.DataFrame:
+        return pd.DataFrame({"year": [YEAR], "value": [self.limit]})
+
+
+def make_electrolysis_pathway(limit: float) -> SimulationPathway:
+    # Pathway with only the attributes used by the electrolysis capacity addition check, which is not part of its
+    #   constraints_to_apply
+    pathway = SimulationPathway.__new__(SimulationPathway)
+    pathway.importer = ElectrolysisImporter(limit)
+    pathway.constraints_to_apply = []
+    pathway.stacks = {YEAR: make_stack([make_asset("Natural Gas SMR", "China")])}
+    pathway.electrolysis_capacity_by_year = {}
+    return pathway
+
+
+def check_electrolysis_capacity_addition(pathway: SimulationPathway) -> bool:
+    return check_constraints(
+        pathway=pathway,
+        stack=make_stack([make_asset("Natural Gas SMR", "Europe")]),
+        year=YEAR,
+        transition_type="greenfield",
+        product="Ammonia",
+        constraints_to_apply=["electrolysis_capacity_addition_constraint"],
+    )["electrolysis_capacity_addition_constraint"]
+
+
+def test_electrolysis_capacity_addition_constraint_not_in_pathway_constraints():
+    assert check_electrolysis_capacity_addition(make_electrolysis_pathway(limit=0))
+    assert not check_electrolysis_capacity_addition(make_electrolysis_pathway(limit=-1))
+
+
+class RegionalPathway:
+    """Provides regional demand and required regional production shares"""
+
+    def __init__(self, demand: dict, shares: dict):
+        self.demand = pd.Series(demand, name="demand")
+        self.shares = shares
+
+    def get_regional_demand_by_region(self, product: str, year: int) -> pd.Series:
+        return self.demand
+
+    def get_regional_production_shares(self, regions) -> np.ndarray:
+        return np.array([self.shares.get(region, np.nan) for region in regions])
+
+
+def make_regional_pathway() -> RegionalPathway:
+    # Required regional production of 1.0 in Europe and 0.5 in China
+    return RegionalPathway(
+        demand={"China": 1.0, "Europe": 2.0},
+        shares={"China": 0.5, "Europe": 0.5},
+    )
+
+
+def check_regional_production(pathway: RegionalPathway, stack: AssetStack) -> bool:
+    return check_constraint_regional_production(
+        pathway=pathway,
+        stack=stack,
+        product="Ammonia",
+        year=YEAR,
+        transition_type="greenfield",
+    )
+
+
+@pytest.mark.parametrize(
+    "cuf_europe, expected",
+    [
+        (1.0, True),
+        # Inside the tolerance, as 1.00 >= 1.00 after rounding to two decimals
+        (0.996, True),
+        # Outside the tolerance, as 0.99 < 1.00 after rounding to two decimals
+        (0.994, False),
+    ],
+)
+def test_regional_production_constraint(cuf_europe: float, expected: bool):
+    stack = make_stack(
+        [
+            make_asset("Natural Gas SMR", "China"),
+            make_asset("Natural Gas SMR", "Europe"),
+        ]
+    )
+    stack.filter_assets(region="Europe")[0].cuf = cuf_europe
+    assert check_regional_production(make_regional_pathway(), stack) == expected
+
+    df = get_regional_production_constraint_table(
+        make_regional_pathway(), stack, "Ammonia", YEAR
+    )
+    assert dict(zip(df["region"], df["check"])) == {"China": True, "Europe": expected}
+    assert dict(zip(df["region"], df["annual_production_volume_minimum"])) == {
+        "China": pytest.approx(0.5),
+        "Europe": pytest.approx(1.0),
+    }
+
+
+def test_regional_production_constraint_region_without_demand():
+    stack = make_stack(
+        [make_asset("Natural Gas SMR", "China"), make_asset("Natural Gas SMR", "India")]
+    )
+    assert not check_regional_production(make_regional_pathway(), stack)
+
+    df = merge_regional_production_and_demand(
+        make_regional_pathway(), stack, "Ammonia", YEAR
+    )
+    assert df.set_index("region")["demand"].to_dict() == {
+        "China": 1.0,
+        "India": pytest.approx(np.nan, nan_ok=True),
+    }
+
+
+class DemandSharePathway:
+    """Provides the global demand and the maximum global demand share of the specified technologies"""
+
+    technologies_maximum_global_demand_share = ["Electrolyser", "Methane Pyrolysis"]
+    cuf_upper_threshold = 0.95
+    maximum_global_demand_share = {YEAR: 0.2}
+
+    def get_demand(self, product: str, year: int, region: str) -> float:
+        return {"Ammonia": 10.0, "Urea": 5.0}[product]
+
+
+def check_global_demand_share(assets: list[Asset]) -> bool:
+    return check_global_demand_share_constraint(
+        pathway=DemandSharePathway(),
+        stack=make_stack(assets),
+        year=YEAR,
+        transition_type="greenfield",
+        product="Ammonia",
+    )
+
+
+def test_global_demand_share_constraint_below_limit():
+    # 1.9 Mt of Ammonia from Electrolyser and 0.95 Mt of Urea from Electrolyser, with limits of 2 Mt and 1 Mt. The
+    #   production of technologies without a maximum share does not count
+    assets = [make_asset("Electrolyser", "China") for _ in range(2)] + [
+        make_asset("Electrolyser", "China", product="Urea"),
+        make_asset("Natural Gas SMR", "China"),
+        make_asset("Natural Gas SMR", "China"),
+        make_asset("Natural Gas SMR", "China"),
+    ]
+    assert check_global_demand_share(assets)
+
+
+def test_global_demand_share_constraint_crosses_limit():
+    # 2.85 Mt of Ammonia from Electrolyser exceed the limit of 2 Mt
+    assets = [make_asset("Electrolyser", "China") for _ in range(3)]
+    assert not check_global_demand_share(assets)
+
+    # 1.9 Mt of Urea from Methane Pyrolysis exceed the limit of 1 Mt, while Electrolyser stays below its limit
+    assets = [
+        make_asset("Electrolyser", "China"),
+        make_asset("Methane Pyrolysis", "China", product="Urea"),
+        make_asset("Methane Pyrolysis", "Europe", product="Urea"),
+    ]
+    assert not check_global_demand_share(assets)
+
+
+CCS_STORAGE = "Natural Gas SMR + CCS (storage)"
+
+
+def make_co2_storage_pathway(
+    df_co2_storage: pd.DataFrame, constraint_type: str, stack: AssetStack
+) -> SimulationPathway:
+    # Pathway with only the attributes used by the CO2 storage check. Technologies with CCS capture 0.5 t CO2 per t of
+    #   product in every year and region (captured CO2 is negative)
+    pathway = SimulationPathway.__new__(SimulationPathway)
+    pathway.co2_storage_constraint = df_co2_storage
+    pathway.co2_storage_constraint_type = constraint_type
+    pathway.stacks = {YEAR - 1: stack, YEAR: stack}
+    df_emissions = pd.DataFrame(
+        [
+            {
+                "product": product,
+                "year": year,
+                "region": region,
+                "technology": technology,
+                "co2_scope1_captured": -0.5 if "CCS" in technology else 0.0,
+            }
+            for product in ["Ammonia", "Clinker"]
+            for year in [YEAR - 1, YEAR, YEAR + 1]
+            for region in ["China", "Europe"]
+            for technology in ["Natural Gas SMR", CCS_STORAGE]
+        ]
+    ).set_index(["product", "year", "region", "technology"])
+    pathway.emission_intensities = make_emission_intensities(df_emissions)
+    return pathway
+
+
+def test_co2_storage_constraint_total_cumulative():
+    # 0.8 Mt of CO2 stored per region over the two modelled years, with regional limits of 0.5 and 1.0 Mt
+    stack = make_stack(
+        [
+            make_asset(CCS_STORAGE, "China", cuf=0.8, product="Clinker"),
+            make_asset(CCS_STORAGE, "Europe", cuf=0.8, product="Clinker"),
+        ]
+    )
+    df_co2_storage = pd.DataFrame(
+        {
+            "year": [YEAR - 1, YEAR - 1, YEAR, YEAR],
+            "region": ["China", "Europe", "China", "Europe"],
+            "value": [0.0, 0.0, 0.5, 1.0],
+        }
+    )
+    pathway = make_co2_storage_pathway(df_co2_storage, "total_cumulative", stack)
+    kwargs = dict(
+        pathway=pathway,
+        stack=stack,
+        product="Clinker",
+        year=YEAR,
+        transition_type="brownfield",
+    )
+
+    assert check_co2_storage_constraint(**kwargs, return_dict=True) == {
+        "China": False,
+        "Europe": True,
+    }
+    assert not check_co2_storage_constraint(**kwargs)
+    assert not check_co2_storage_constraint(**kwargs, region="China")
+    assert check_co2_storage_constraint(**kwargs, region="Europe")
+
+
+@pytest.mark.parametrize(
+    "constraint_type, limit, expected",
+    [
+        # Captured CO2 of the stack in that year: -0.8 Mt
+        ("annual_cumulative", -0.8, True),
+        ("annual_cumulative", -0.9, False),
+        # Additional captured CO2 of the stack compared to the pathway's stack: 0.0 Mt
+        ("annual_addition", 0.0, True),
+        ("annual_addition", -0.1, False),
+    ],
+)
+def test_co2_storage_constraint_annual(
+    constraint_type: str, limit: float, expected: bool
+):
+    # Global limit by year, without a region column
+    stack = make_stack(
+        [
+            make_asset(CCS_STORAGE, "China", cuf=0.8),
+            make_asset(CCS_STORAGE, "Europe", cuf=0.8),
+            make_asset("Natural Gas SMR", "Europe"),
+        ]
+    )
+    df_co2_storage = pd.DataFrame({"year": [YEAR - 1, YEAR], "value": [1.0, limit]})
+    pathway = make_co2_storage_pathway(df_co2_storage, constraint_type, stack)
+
+    assert (
+        check_co2_storage_constraint(
+            pathway=pathway,
+            stack=stack,
+            product="Ammonia",
+            year=YEAR,
+            transition_type="greenfield",
+        )
+        == expected
+    )
+
+
+class BiomassPathway:
+    """Provides the biomass limit and the biomass consumption of technologies in GJ per t of product"""
+
+    def __init__(self, limit: float):
+        self.biomass_constraint = pd.DataFrame({"year": [YEAR], "value": [limit]})
+        self.biomass_limits = {YEAR: limit}
+        self.df_biomass_consumption = pd.DataFrame(
+            {
+                "year": [YEAR - 1, YEAR, YEAR],
+                "region": ["China", "China", "Europe"],
+                "technology_destination": ["Kiln biomass"] * 3,
+                "value": [100.0, 2.0, 2.0],
+            }
+        )
+
+
+@pytest.mark.parametrize(
+    "limit, expected",
+    [
+        # Consumption of 2.6e6 GJ in that year: 0.8 Mt in China and 0.5 Mt in Europe at 2 GJ/t. The Ammonia asset and
+        #   the Kiln coal asset do not consume biomass
+        (2.6e6, True),
+        (2.6e6 - 1, False),
+    ],
+)
+def test_biomass_constraint(limit: float, expected: bool):
+    stack = make_stack(
+        [
+            make_asset("Kiln biomass", "China", cuf=0.8, product="Clinker"),
+            make_asset("Kiln biomass", "Europe", cuf=0.5, product="Clinker"),
+            make_asset("Kiln coal", "Europe", product="Clinker"),
+            make_asset("Kiln biomass", "China"),
+        ]
+    )
+    assert (
+        check_biomass_constraint(
+            pathway=BiomassPathway(limit),
+            product="Clinker",
+            stack=stack,
+            year=YEAR,
+            transition_type="brownfield",
+        )
+        == expected
+    )
+
+
+def make_ranking() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "technology_origin": [
+                "New-build",
+                "New-build",
+                "Prebake Coal",
+                "New-build",
+            ],
+            "technology_destination": [
+                "Prebake Hydro",
+                "Prebake Coal",
+                "Prebake Hydro",
+                "Prebake Hydro + Inert anode",
+            ],
+            "cost": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+
+def test_hydro_constraints():
+    # New-build transitions to technologies with Hydro in their name are removed, other transitions are kept
+    df_ranking = make_ranking()
+    pd.testing.assert_frame_equal(
+        hydro_constraints(df_ranking, sector="aluminium"), df_ranking.iloc[[1, 2]]
+    )
+
+
+def test_hydro_constraints_without_ban():
+    df_ranking = make_ranking()
+    pd.testing.assert_frame_equal(
+        hydro_constraints(df_ranking, sector="ammonia"), df_ranking
+    )
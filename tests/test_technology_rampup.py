@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from mppshared.models.technology_rampup import TechnologyRampup
+
+
+def make_rampup(ramp_up_start_year: int, ramp_up_end_year: int) -> TechnologyRampup:
+    return TechnologyRampup(
+        model_start_year=2020,
+        model_end_year=2050,
+        technology="Electrolyser",
+        ramp_up_start_year=ramp_up_start_year,
+        ramp_up_end_year=ramp_up_end_year,
+        init_maximum_asset_additions=2,
+        maximum_asset_growth_rate=0.5,
+        curve_type="exponential",
+    )
+
+
+def test_exponential_rampup():
+    df_rampup = make_rampup(ramp_up_start_year=2025, ramp_up_end_year=2030).df_rampup
+    assert df_rampup.index[0] == 2020
+    assert df_rampup.index[-1] == 2050
+    assert np.isnan(df_rampup.loc[2024, "maximum_asset_additions"])
+    assert df_rampup.loc[2025, "maximum_asset_additions"] == 2
+    assert df_rampup.loc[2027, "maximum_asset_additions"] == np.round(2 * 1.5**2)
+    assert df_rampup.loc[2030, "maximum_asset_additions"] == np.round(2 * 1.5**5)
+    assert np.isnan(df_rampup.loc[2031, "maximum_asset_additions"])
+
+
+def test_rampup_starting_before_model_start_year():
+    with pytest.raises(ValueError):
+        make_rampup(ramp_up_start_year=2018, ramp_up_end_year=2028)